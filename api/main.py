@@ -6,6 +6,7 @@ Now organized with separate route modules for maintainability.
 Run with: uvicorn api.main:app --reload --port 8000
 """
 
+import asyncio
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -75,6 +76,7 @@ async def startup_event():
         # Optional modules
         try:
             memory = get_memory_manager()
+            await asyncio.to_thread(memory.warmup)
             logger.info("Memory system initialized")
         except Exception as e:
             logger.warning(f"Memory disabled: {e}")
@@ -2,6 +2,7 @@
 RAG Routes - Document Upload & Search
 """
 
+import asyncio
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, UploadFile, File
 
@@ -42,9 +43,15 @@ async def upload_document(
         content = await file.read()
         temp_path.write_bytes(content)
         
-        # Index document
+        # Index document (blocking parse/chunk/store, off the event loop)
         indexer = get_indexer()
-        chunks = await indexer.index_document(str(temp_path))
+        document = await asyncio.to_thread(
+            indexer.index_document, str(temp_path), user_id=user_id
+        )
+        chunks = document.num_chunks
+        
+        # New content: drop cached search results
+        service.rag.clear_cache()
         
         # Clean up
         temp_path.unlink()
@@ -144,6 +144,7 @@ class AssistantOrchestrator:
             # Load memory system
             try:
                 self.memory = get_memory_manager()
+                self.memory.warmup()
                 logger.info("Memory system initialized")
                 print(f"[OK] Memory: Hybrid SQL + Vector storage")
             except Exception as e:
@@ -273,6 +274,10 @@ class AssistantOrchestrator:
             logger.warning("Wake word required but detector not available")
             return True
         
+        # Free the STT microphone so the detector can open the device
+        if self.stt:
+            self.stt.close()
+        
         try:
             logger.debug("Listening for wake word...")
             self.wake_word.start()
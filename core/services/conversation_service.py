@@ -9,13 +9,15 @@ Key changes:
 
 import time
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 import asyncio
 
 from modules.intent.base import IntentType
 from modules.actions.registry import ActionRegistry
+from modules.memory.base import RetrievalResult
 from modules.memory.memory_manager import MemoryManager
+from modules.rag.base import RAGResult
 from modules.rag.retriever import HybridRetriever
 from utils.logger import get_logger, log_conversation
 
@@ -80,55 +82,11 @@ class ConversationService:
         try:
             logger.info(f"[{session_id}] Processing: {user_input[:50]}... (client={client_type})")
             
-            # Step 1: Retrieve Memory Context
-            memory_context = ""
-            memory_results = []
-            if self.memory:
-                try:
-                    logger.debug(f"[{session_id}] Retrieving memory context...")
-                    
-                    memory_results = await self.memory.retrieve_context(
-                        query=user_input,
-                        session_id=session_id,
-                        user_id=user_id,
-                        max_results=3,
-                        include_recent=True
-                    )
-                    
-                    if memory_results:
-                        memory_context = self.memory.format_context_for_prompt(
-                            memory_results,
-                            max_length=500
-                        )
-                        logger.info(
-                            f"[{session_id}] Retrieved {len(memory_results)} "
-                            f"memory items from THIS session"
-                        )
-                except Exception as e:
-                    logger.error(f"[{session_id}] Memory retrieval error: {e}")
-            
-            # Step 2: Search RAG Documents
-            rag_context = ""
-            rag_results = []
-            if self.rag:
-                try:
-                    logger.debug(f"[{session_id}] Searching RAG documents...")
-                    rag_results = await self.rag.retrieve(
-                        query=user_input,
-                        top_k=3
-                    )
-                    
-                    if rag_results:
-                        rag_context = self.rag.format_context(
-                            rag_results,
-                            max_length=800
-                        )
-                        logger.info(
-                            f"[{session_id}] Retrieved {len(rag_results)} "
-                            f"document chunks"
-                        )
-                except Exception as e:
-                    logger.error(f"[{session_id}] RAG retrieval error: {e}")
+            # Steps 1-2: Retrieve memory and document context concurrently
+            (memory_results, memory_context), (rag_results, rag_context) = await asyncio.gather(
+                self._retrieve_memory(user_input, session_id, user_id),
+                self._retrieve_documents(user_input, session_id)
+            )
             
             # Step 3: Detect Intent
             logger.debug(f"[{session_id}] Detecting intent...")
@@ -249,6 +207,71 @@ class ConversationService:
                 }
             }
     
+    async def _retrieve_memory(
+        self,
+        user_input: str,
+        session_id: str,
+        user_id: str
+    ) -> Tuple[List[RetrievalResult], str]:
+        """Step 1: Retrieve memory context (results, prompt text)"""
+        memory_context = ""
+        memory_results = []
+        if self.memory:
+            try:
+                logger.debug(f"[{session_id}] Retrieving memory context...")
+                
+                memory_results = await self.memory.retrieve_context(
+                    query=user_input,
+                    session_id=session_id,
+                    user_id=user_id,
+                    max_results=3,
+                    include_recent=True
+                )
+                
+                if memory_results:
+                    memory_context = self.memory.format_context_for_prompt(
+                        memory_results,
+                        max_length=500
+                    )
+                    logger.info(
+                        f"[{session_id}] Retrieved {len(memory_results)} "
+                        f"memory items from THIS session"
+                    )
+            except Exception as e:
+                logger.error(f"[{session_id}] Memory retrieval error: {e}")
+        
+        return memory_results, memory_context
+    
+    async def _retrieve_documents(
+        self,
+        user_input: str,
+        session_id: str
+    ) -> Tuple[List[RAGResult], str]:
+        """Step 2: Search RAG documents (results, prompt text)"""
+        rag_context = ""
+        rag_results = []
+        if self.rag:
+            try:
+                logger.debug(f"[{session_id}] Searching RAG documents...")
+                rag_results = await self.rag.retrieve(
+                    query=user_input,
+                    top_k=3
+                )
+                
+                if rag_results:
+                    rag_context = self.rag.format_context(
+                        rag_results,
+                        max_length=800
+                    )
+                    logger.info(
+                        f"[{session_id}] Retrieved {len(rag_results)} "
+                        f"document chunks"
+                    )
+            except Exception as e:
+                logger.error(f"[{session_id}] RAG retrieval error: {e}")
+        
+        return rag_results, rag_context
+    
     async def _handle_action(
         self, 
         user_input: str,
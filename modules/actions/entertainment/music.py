@@ -8,6 +8,7 @@ Now supports:
 - Local file streaming
 """
 
+import asyncio
 import yaml
 from pathlib import Path
 from typing import List, Optional, Dict, Any
@@ -167,9 +168,9 @@ class MusicAction(Action):
     async def _handle_play(self, query: Optional[str], client_type: str) -> ActionResult:
         """Handle play command"""
         
-        # Get song info
+        # Get song info (may download from YouTube - keep it off the event loop)
         if query:
-            song_info = self._get_song_info(query)
+            song_info = await asyncio.to_thread(self._get_song_info, query)
         else:
             song_info = self._get_random_song_info()
         
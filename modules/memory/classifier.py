@@ -5,6 +5,7 @@ Now uses AI provider abstraction instead of direct OpenAI calls.
 """
 
 import json
+import re
 from typing import Optional, List
 
 from modules.memory.base import (
@@ -15,6 +16,9 @@ from utils.logger import get_logger
 
 logger = get_logger('memory.classifier')
 
+# Markdown code fence some models wrap their JSON reply in
+_CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
 
 def get_ai_provider():
     from core.ai.integration import get_ai_provider as _provider
@@ -82,10 +86,8 @@ class AIMemoryClassifier(MemoryClassifier):
             result_text = response.content.strip()
             
             # Remove markdown code blocks if present
-            if result_text.startswith("```json"):
-                result_text = result_text.replace("```json", "").replace("```", "").strip()
-            elif result_text.startswith("```"):
-                result_text = result_text.replace("```", "").strip()
+            if result_text.startswith("```"):
+                result_text = _CODE_FENCE_RE.sub("", result_text)
             
             result = json.loads(result_text)
             
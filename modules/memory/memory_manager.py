@@ -5,8 +5,11 @@ Handles multi-device, multi-user conversation isolation.
 Each device/conversation maintains its own session.
 """
 
+import asyncio
+import threading
 import uuid
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 
 from modules.memory.base import (
@@ -20,6 +23,9 @@ from utils.logger import get_logger
 
 logger = get_logger('memory.manager')
 
+# Query embeddings kept for repeated fact searches
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
 class MemoryManager:
     """
     Session-aware memory orchestrator.
@@ -34,8 +40,20 @@ class MemoryManager:
     def __init__(
         self,
         db_path: str = "data/memory.db",
-        vector_path: str = "data/chromadb"
+        vector_path: str = "data/chromadb",
+        embedding_function: Optional[Any] = None,
+        hnsw_profile: str = "balanced"
     ):
+        """
+        Args:
+            db_path: SQLite database for conversations and facts
+            vector_path: ChromaDB directory for fact embeddings
+            embedding_function: Chroma embedding function for facts
+                (defaults to Chroma's built-in model; tests can pass a
+                cheap deterministic one)
+            hnsw_profile: Vector index preset ("fast", "balanced" or
+                "accurate"), applied when the collection is created
+        """
         # Initialize components
         self.sql_store = SQLStore(db_path)
         self.sql_store.initialize()
@@ -45,14 +63,45 @@ class MemoryManager:
         # Vector store (optional)
         self.vector_store: Optional[ChromaVectorStore] = None
         if CHROMADB_AVAILABLE:
-            self.vector_store = ChromaVectorStore(vector_path)
+            self.vector_store = ChromaVectorStore(
+                vector_path,
+                embedding_function=embedding_function,
+                hnsw_profile=hnsw_profile
+            )
             self.vector_store.initialize()
             logger.info("Vector store enabled")
         else:
             logger.warning("Vector store disabled (ChromaDB not installed)")
         
+        # LRU of query embeddings (query text -> embedding)
+        self._query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+        
         logger.info("Memory manager initialized (session-aware)")
     
+    def warmup(self):
+        """
+        Load lazily initialized pieces up front.
+        
+        The embedding model loads on first use and the SQLite and HNSW
+        index pages are read on first query; without this the user's
+        first turn pays for all of it.
+        """
+        try:
+            self.sql_store.search_facts("warmup", limit=1)
+            
+            if self.vector_store:
+                self.vector_store.search(
+                    query="warmup",
+                    limit=1,
+                    query_embedding=self._embed_query_cached("warmup")
+                )
+            
+            logger.info("Memory warmed up")
+            
+        except Exception as e:
+            logger.debug(f"Memory warm-up skipped: {e}")
+    
     @staticmethod
     def generate_session_id(
         user_id: str,
@@ -135,46 +184,19 @@ class MemoryManager:
                 intent_type
             )
             
-            # Step 2: Handle based on category
-            if classification.category == MemoryCategory.EPHEMERAL:
-                logger.debug(f"[{session_id[:20]}...] Ephemeral - not storing")
-                return classification
-            
-            # Step 3: Get turn number for this session
-            turn_no = self.sql_store.get_session_turn_count(session_id) + 1
-            
-            # Step 4: Store conversation in SQL with session info
-            conversation = Conversation(
-                session_id=session_id,      # ✅ Session tracking
-                user_id=user_id,            # ✅ User tracking
-                turn_no=turn_no,
+            # Steps 2-5: Store according to category
+            return self._store_classified(
+                classification,
                 user_input=user_input,
                 assistant_response=assistant_response,
+                session_id=session_id,
+                user_id=user_id,
                 intent_type=intent_type,
                 duration_ms=duration_ms,
                 prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                timestamp=datetime.now()
+                completion_tokens=completion_tokens
             )
             
-            conv_id = self.sql_store.store_conversation(conversation)
-            logger.info(
-                f"[{session_id[:20]}...] Stored conversation {conv_id} "
-                f"as {classification.category.value} (turn {turn_no})"
-            )
-            
-            # Step 5: If FACTUAL, extract and store facts (cross-session)
-            if classification.category == MemoryCategory.FACTUAL:
-                await self._store_facts(
-                    classification,
-                    conv_id,
-                    user_id,
-                    user_input,
-                    assistant_response
-                )
-            
-            return classification
-            
         except Exception as e:
             logger.error(
                 f"[{session_id[:20]}...] Error processing conversation: {e}",
@@ -182,18 +204,136 @@ class MemoryManager:
             )
             raise
     
-    async def _store_facts(
+    async def process_conversations_bulk(
+        self,
+        turns: List[Dict[str, Any]]
+    ) -> List[MemoryClassification]:
+        """
+        Process several conversation turns at once.
+        
+        Classification (the slow, AI-bound step) runs concurrently for all
+        turns, before anything is written; storage then happens in the
+        given order, so turn numbers within each session stay sequential.
+        All turns are written in one short SQL transaction, and facts from
+        every turn are embedded together once it has committed.
+        
+        Args:
+            turns: One dict of process_conversation arguments per turn
+            
+        Returns:
+            MemoryClassification for each turn, in order
+        """
+        classifications = await asyncio.gather(*(
+            self.classifier.classify(
+                turn['user_input'],
+                turn['assistant_response'],
+                turn.get('intent_type')
+            )
+            for turn in turns
+        ))
+        
+        results = []
+        pending_embeddings = []
+        with self.sql_store.transaction():
+            for turn, classification in zip(turns, classifications):
+                session_id = turn['session_id']
+                try:
+                    results.append(self._store_classified(
+                        classification,
+                        pending_embeddings=pending_embeddings,
+                        **turn
+                    ))
+                except Exception as e:
+                    logger.error(
+                        f"[{session_id[:20]}...] Error processing conversation: {e}",
+                        exc_info=True
+                    )
+                    raise
+        
+        # Only committed facts get vectors
+        self._embed_facts(pending_embeddings)
+        
+        return results
+    
+    def _store_classified(
+        self,
+        classification: MemoryClassification,
+        user_input: str,
+        assistant_response: str,
+        session_id: str,
+        user_id: str = "default_user",
+        intent_type: Optional[str] = None,
+        duration_ms: float = 0.0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        pending_embeddings: Optional[List[Tuple[int, str, Dict[str, Any]]]] = None
+    ) -> MemoryClassification:
+        """
+        Store a classified conversation turn (and its facts).
+        
+        Fact embeddings are added right away, or appended to
+        pending_embeddings when the caller embeds a whole batch later.
+        """
+        # Handle based on category
+        if classification.category == MemoryCategory.EPHEMERAL:
+            logger.debug(f"[{session_id[:20]}...] Ephemeral - not storing")
+            return classification
+        
+        # Get turn number for this session
+        turn_no = self.sql_store.get_session_turn_count(session_id) + 1
+        
+        # Store conversation in SQL with session info
+        conversation = Conversation(
+            session_id=session_id,      # ✅ Session tracking
+            user_id=user_id,            # ✅ User tracking
+            turn_no=turn_no,
+            user_input=user_input,
+            assistant_response=assistant_response,
+            intent_type=intent_type,
+            duration_ms=duration_ms,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            timestamp=datetime.now()
+        )
+        
+        conv_id = self.sql_store.store_conversation(conversation)
+        logger.info(
+            f"[{session_id[:20]}...] Stored conversation {conv_id} "
+            f"as {classification.category.value} (turn {turn_no})"
+        )
+        
+        # If FACTUAL, extract and store facts (cross-session)
+        if classification.category == MemoryCategory.FACTUAL:
+            stored_facts = self._store_facts(
+                classification,
+                conv_id,
+                user_id,
+                user_input,
+                assistant_response
+            )
+            
+            if pending_embeddings is None:
+                self._embed_facts(stored_facts)
+            else:
+                pending_embeddings.extend(stored_facts)
+        
+        return classification
+    
+    def _store_facts(
         self,
         classification: MemoryClassification,
         conversation_id: int,
         user_id: str,
         user_input: str,
         assistant_response: str
-    ):
+    ) -> List[Tuple[int, str, Dict[str, Any]]]:
         """
         Store extracted facts (cross-session).
         
         ✅ FIXED: Store extracted facts, not full conversation
+        
+        Returns:
+            (fact_id, content, metadata) of each fact, ready for _embed_facts
         """
         
         # ✅ FIX: Use extracted facts if available
@@ -204,6 +344,7 @@ class MemoryManager:
             facts_to_store = [user_input]
         
         # Store each extracted fact separately
+        stored = []
         for fact_text in facts_to_store:
             fact = Fact(
                 content=fact_text,  # ✅ FIXED: Use extracted fact
@@ -218,26 +359,44 @@ class MemoryManager:
             fact_id = self.sql_store.store_fact(fact)
             logger.info(f"Stored fact {fact_id}: {fact_text[:50]}... (shared)")
             
-            # Store in vector DB if available
-            if self.vector_store:
-                try:
-                    embedding_id = self.vector_store.add_embedding(
-                        fact_id=fact_id,
-                        content=fact_text,  # ✅ FIXED: Embed the fact
-                        metadata={
-                            "user_id": user_id,
-                            "category": fact.category.value if fact.category else "unknown",
-                            "importance": fact.importance_score,
-                            "created_at": datetime.now().isoformat(),
-                            "is_fact": True
-                        }
-                    )
-                    
-                    self.sql_store.update_fact_embedding(fact_id, embedding_id)
-                    logger.debug(f"Added embedding {embedding_id} for fact")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to add embedding: {e}")
+            # Known facts keep their existing vector (no re-embedding)
+            if fact.embedding_id:
+                continue
+            
+            stored.append((
+                fact_id,
+                fact_text,  # ✅ FIXED: Embed the fact
+                {
+                    "user_id": user_id,
+                    "category": fact.category.value if fact.category else "unknown",
+                    "importance": fact.importance_score,
+                    "created_at": datetime.now().isoformat(),
+                    "is_fact": True
+                }
+            ))
+        
+        return stored
+    
+    def _embed_facts(self, facts: List[Tuple[int, str, Dict[str, Any]]]):
+        """Add stored facts to the vector DB (if available) in one batch"""
+        if not self.vector_store or not facts:
+            return
+        
+        # The same new fact can come from several turns of one batch
+        unique = {}
+        for entry in facts:
+            unique.setdefault(entry[0], entry)
+        facts = list(unique.values())
+        
+        try:
+            embedding_ids = self.vector_store.add_embeddings(facts)
+            
+            for (fact_id, _, _), embedding_id in zip(facts, embedding_ids):
+                self.sql_store.update_fact_embedding(fact_id, embedding_id)
+            logger.debug(f"Added {len(embedding_ids)} fact embeddings")
+            
+        except Exception as e:
+            logger.error(f"Failed to add embedding: {e}")
     
     async def retrieve_context(
         self,
@@ -250,7 +409,30 @@ class MemoryManager:
     ) -> List[RetrievalResult]:
         """
         Retrieve relevant context with SESSION ISOLATION.
+        
+        The SQL and vector lookups block, so they run in a worker thread;
+        concurrent retrievals overlap instead of queuing on the event loop.
         """
+        return await asyncio.to_thread(
+            self._retrieve_context_sync,
+            query,
+            session_id,
+            user_id,
+            max_results,
+            include_recent,
+            include_facts
+        )
+    
+    def _retrieve_context_sync(
+        self,
+        query: str,
+        session_id: str,
+        user_id: str,
+        max_results: int,
+        include_recent: bool,
+        include_facts: bool
+    ) -> List[RetrievalResult]:
+        """Blocking body of retrieve_context"""
         try:
             all_results = []
             
@@ -346,7 +528,8 @@ class MemoryManager:
                         user_id=user_id,
                         limit=max_results // 2,
                         min_similarity=0.3,
-                        filter_facts_only=True
+                        filter_facts_only=True,
+                        query_embedding=self._embed_query_cached(query)
                     )
                     all_results.extend(fact_vector_results)
                     
@@ -377,6 +560,36 @@ class MemoryManager:
             )
             return []
         
+    def _embed_query_cached(self, query: str) -> Optional[List[float]]:
+        """
+        Embed a query, reusing embeddings of recent queries.
+        
+        Returns None if embedding fails (search then embeds the text itself).
+        """
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(query)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(query)
+                return embedding
+        
+        try:
+            embedding = self.vector_store.embed_query(query)
+        except Exception as e:
+            logger.debug(f"Query embedding failed: {e}")
+            return None
+        
+        with self._query_embeddings_lock:
+            self._query_embeddings[query] = embedding
+            if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        
+        return embedding
+    
+    def clear_query_cache(self):
+        """Forget cached query embeddings"""
+        with self._query_embeddings_lock:
+            self._query_embeddings.clear()
+    
     def _deduplicate_and_rank(
         self,
         results: List[RetrievalResult],
@@ -391,8 +604,8 @@ class MemoryManager:
         unique_results = []
         
         for result in results:
-            # Use first 100 chars as dedup key
-            content_key = result.content[:100].lower().strip()
+            # Hash of the first 100 chars as dedup key
+            content_key = hash(result.content[:100].strip().casefold())
             
             if content_key not in seen_content:
                 seen_content.add(content_key)
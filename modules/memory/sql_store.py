@@ -7,8 +7,10 @@ Handles all SQL operations with proper indexing, FTS5, and provenance tracking.
 import sqlite3
 import hashlib
 import json
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Iterator, Optional, List, Dict, Any
 from datetime import datetime
 
 from modules.memory.base import (
@@ -26,17 +28,67 @@ class SQLStore(MemoryStore):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.conn: Optional[sqlite3.Connection] = None
+        # transaction() state: held by one thread at a time, nesting depth
+        self._transaction_lock = threading.RLock()
+        self._transaction_depth = 0
         logger.info(f"SQLStore initialized (path={self.db_path})")
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
+        """
+        Get database connection.
+        
+        Tuned for many small writes with interleaved reads: WAL journal
+        (readers don't block the writer), NORMAL sync, 64MB page cache,
+        in-memory temp tables, 256MB mmap and a 5s busy timeout for other
+        processes sharing the file. WAL keeps `-wal`/`-shm` files next to
+        the database.
+        """
         if self.conn is None:
             self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
             self.conn.row_factory = sqlite3.Row
-            # Enable foreign keys
-            self.conn.execute("PRAGMA foreign_keys = ON")
+            self.conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA cache_size=-65536;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA mmap_size=268435456;
+                PRAGMA busy_timeout=5000;
+                PRAGMA foreign_keys=ON;
+            """)
         return self.conn
     
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Group writes into one transaction (one commit, one WAL sync).
+        
+        The write lock is held until the block exits, so keep it short
+        and synchronous (no awaits, no network calls). Every store method
+        writes through transaction() too: called inside a block it joins
+        it (no commit of its own); called from another thread it waits
+        until the block finishes. Rolls back on error.
+        """
+        with self._transaction_lock:
+            conn = self._get_connection()
+            if self._transaction_depth:
+                self._transaction_depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._transaction_depth -= 1
+                return
+            
+            conn.execute("BEGIN IMMEDIATE")
+            self._transaction_depth = 1
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._transaction_depth = 0
+    
     def initialize(self):
         """Create all tables and indexes"""
         logger.info("Initializing database schema...")
@@ -127,16 +179,31 @@ class SQLStore(MemoryStore):
             ON facts(deleted_at) WHERE deleted_at IS NULL
         """)
         
-        # 3. FTS5 table for facts
+        # 3. FTS5 table for facts (stemmed, with 2/3-char prefix indexes
+        # for the wildcard terms _clean_fts_query emits). Older databases
+        # used the default tokenizer; drop that index and rebuild it.
+        row = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'facts_fts'"
+        ).fetchone()
+        migrate_fts = row is not None and 'porter' not in row['sql']
+        if migrate_fts:
+            cursor.execute("DROP TRIGGER IF EXISTS facts_fts_insert")
+            cursor.execute("DROP TRIGGER IF EXISTS facts_fts_delete")
+            cursor.execute("DROP TRIGGER IF EXISTS facts_fts_update")
+            cursor.execute("DROP TABLE facts_fts")
+        
         cursor.execute("""
             CREATE VIRTUAL TABLE IF NOT EXISTS facts_fts USING fts5(
                 content,
                 content='facts',
-                content_rowid='id'
+                content_rowid='id',
+                tokenize='porter unicode61',
+                prefix='2 3'
             )
         """)
         
-        # Triggers to keep FTS in sync
+        # Triggers to keep FTS in sync (external content tables remove
+        # old rows with the 'delete' command)
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS facts_fts_insert 
             AFTER INSERT ON facts BEGIN
@@ -146,16 +213,21 @@ class SQLStore(MemoryStore):
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS facts_fts_delete 
             AFTER DELETE ON facts BEGIN
-                DELETE FROM facts_fts WHERE rowid = old.id;
+                INSERT INTO facts_fts(facts_fts, rowid, content) VALUES ('delete', old.id, old.content);
             END
         """)
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS facts_fts_update 
-            AFTER UPDATE ON facts BEGIN
-                UPDATE facts_fts SET content = new.content WHERE rowid = new.id;
+            AFTER UPDATE OF content ON facts BEGIN
+                INSERT INTO facts_fts(facts_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO facts_fts(rowid, content) VALUES (new.id, new.content);
             END
         """)
         
+        if migrate_fts:
+            cursor.execute("INSERT INTO facts_fts(facts_fts) VALUES ('rebuild')")
+            logger.info("Facts FTS index migrated to porter tokenizer")
+        
         # 4. Preferences table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS preferences (
@@ -218,28 +290,27 @@ class SQLStore(MemoryStore):
     
     def store_conversation(self, conversation: Conversation) -> int:
         """Store a conversation and return its ID"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO conversations (
-                session_id, user_id, turn_no, user_input, assistant_response,
-                intent_type, duration_ms, prompt_tokens, completion_tokens, timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            conversation.session_id,
-            conversation.user_id,
-            conversation.turn_no,
-            conversation.user_input,
-            conversation.assistant_response,
-            conversation.intent_type,
-            conversation.duration_ms,
-            conversation.prompt_tokens,
-            conversation.completion_tokens,
-            conversation.timestamp or datetime.now()
-        ))
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                INSERT INTO conversations (
+                    session_id, user_id, turn_no, user_input, assistant_response,
+                    intent_type, duration_ms, prompt_tokens, completion_tokens, timestamp
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                conversation.session_id,
+                conversation.user_id,
+                conversation.turn_no,
+                conversation.user_input,
+                conversation.assistant_response,
+                conversation.intent_type,
+                conversation.duration_ms,
+                conversation.prompt_tokens,
+                conversation.completion_tokens,
+                conversation.timestamp or datetime.now()
+            ))
         
-        conn.commit()
         conv_id = cursor.lastrowid
         
         logger.debug(f"Stored conversation {conv_id}")
@@ -247,47 +318,49 @@ class SQLStore(MemoryStore):
     
     def store_fact(self, fact: Fact) -> int:
         """Store a fact with deduplication"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Generate content hash if not provided
-        if not fact.content_hash:
-            fact.content_hash = self._hash_content(fact.content)
-        
-        # Check for existing fact (deduplication)
-        cursor.execute("""
-            SELECT id FROM facts 
-            WHERE user_id = ? AND content_hash = ? AND deleted_at IS NULL
-        """, (fact.user_id, fact.content_hash))
-        
-        existing = cursor.fetchone()
-        if existing:
-            logger.debug(f"Fact already exists (id={existing['id']}), skipping duplicate")
-            return existing['id']
-        
-        # Insert new fact
-        cursor.execute("""
-            INSERT INTO facts (
-                user_id, content, content_hash, category, importance_score,
-                conversation_id, message_id, source_doc_id, source_span,
-                embedding_id, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            fact.user_id,
-            fact.content,
-            fact.content_hash,
-            fact.category.value if fact.category else None,
-            fact.importance_score,
-            fact.conversation_id,
-            fact.message_id,
-            fact.source_doc_id,
-            json.dumps(fact.source_span) if fact.source_span else None,
-            fact.embedding_id,
-            fact.created_at or datetime.now(),
-            fact.updated_at or datetime.now()
-        ))
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Generate content hash if not provided
+            if not fact.content_hash:
+                fact.content_hash = self._hash_content(fact.content)
+            
+            # Check for existing fact (deduplication)
+            cursor.execute("""
+                SELECT id, embedding_id FROM facts 
+                WHERE user_id = ? AND content_hash = ? AND deleted_at IS NULL
+            """, (fact.user_id, fact.content_hash))
+            
+            existing = cursor.fetchone()
+            if existing:
+                logger.debug(f"Fact already exists (id={existing['id']}), skipping duplicate")
+                # Tell the caller whether the stored fact is already embedded
+                fact.id = existing['id']
+                fact.embedding_id = existing['embedding_id']
+                return existing['id']
+            
+            # Insert new fact
+            cursor.execute("""
+                INSERT INTO facts (
+                    user_id, content, content_hash, category, importance_score,
+                    conversation_id, message_id, source_doc_id, source_span,
+                    embedding_id, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                fact.user_id,
+                fact.content,
+                fact.content_hash,
+                fact.category.value if fact.category else None,
+                fact.importance_score,
+                fact.conversation_id,
+                fact.message_id,
+                fact.source_doc_id,
+                json.dumps(fact.source_span) if fact.source_span else None,
+                fact.embedding_id,
+                fact.created_at or datetime.now(),
+                fact.updated_at or datetime.now()
+            ))
         
-        conn.commit()
         fact_id = cursor.lastrowid
         
         logger.debug(f"Stored fact {fact_id}: {fact.content[:50]}...")
@@ -377,31 +450,30 @@ class SQLStore(MemoryStore):
         Returns:
             Number of deleted conversations
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        if keep_factual:
-            # Delete only ephemeral/conversational (no associated facts)
-            cursor.execute("""
-                DELETE FROM conversations
-                WHERE timestamp < ?
-                    AND deleted_at IS NULL
-                    AND id NOT IN (
-                        SELECT DISTINCT conversation_id 
-                        FROM facts
-                        WHERE conversation_id IS NOT NULL
-                    )
-            """, (cutoff_date,))
-        else:
-            # Delete all old conversations
-            cursor.execute("""
-                DELETE FROM conversations
-                WHERE timestamp < ?
-                    AND deleted_at IS NULL
-            """, (cutoff_date,))
-        
-        deleted = cursor.rowcount
-        conn.commit()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            if keep_factual:
+                # Delete only ephemeral/conversational (no associated facts)
+                cursor.execute("""
+                    DELETE FROM conversations
+                    WHERE timestamp < ?
+                        AND deleted_at IS NULL
+                        AND id NOT IN (
+                            SELECT DISTINCT conversation_id 
+                            FROM facts
+                            WHERE conversation_id IS NOT NULL
+                        )
+                """, (cutoff_date,))
+            else:
+                # Delete all old conversations
+                cursor.execute("""
+                    DELETE FROM conversations
+                    WHERE timestamp < ?
+                        AND deleted_at IS NULL
+                """, (cutoff_date,))
+            
+            deleted = cursor.rowcount
         
         logger.info(f"Deleted {deleted} old conversations")
         return deleted
@@ -591,7 +663,7 @@ class SQLStore(MemoryStore):
             AND f.deleted_at IS NULL
             AND f.user_id = ?
             ORDER BY 
-                bm25_score DESC,
+                bm25_score ASC,
                 f.importance_score DESC,
                 days_old ASC
             LIMIT ?
@@ -630,30 +702,28 @@ class SQLStore(MemoryStore):
     
     def update_fact_embedding(self, fact_id: int, embedding_id: str):
         """Update the embedding_id for a fact"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE facts 
-            SET embedding_id = ?, updated_at = CURRENT_TIMESTAMP 
-            WHERE id = ?
-        """, (embedding_id, fact_id))
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                UPDATE facts 
+                SET embedding_id = ?, updated_at = CURRENT_TIMESTAMP 
+                WHERE id = ?
+            """, (embedding_id, fact_id))
         
-        conn.commit()
         logger.debug(f"Updated embedding for fact {fact_id}")
     
     def soft_delete_fact(self, fact_id: int):
         """Soft delete a fact"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE facts 
-            SET deleted_at = CURRENT_TIMESTAMP 
-            WHERE id = ?
-        """, (fact_id,))
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                UPDATE facts 
+                SET deleted_at = CURRENT_TIMESTAMP 
+                WHERE id = ?
+            """, (fact_id,))
         
-        conn.commit()
         logger.info(f"Soft deleted fact {fact_id}")
     
     def get_stats(self) -> Dict[str, Any]:
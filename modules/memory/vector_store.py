@@ -5,12 +5,14 @@ Handles semantic search using embeddings for factual information.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
 try:
     import chromadb
+    import chromadb.errors
     from chromadb.config import Settings
     CHROMADB_AVAILABLE = True
 except ImportError:
@@ -21,6 +23,51 @@ from utils.logger import get_logger
 
 logger = get_logger('memory.vector_store')
 
+# New collections index in cosine space: HNSW normalizes each vector once
+# at insert, so queries rank by a plain inner product and distances are
+# 1 - cosine similarity (what _parse_results assumes). The space of an
+# existing collection is fixed when it was created.
+DISTANCE_SPACE = "cosine"
+
+# HNSW index presets for new collections. Higher M / construction_ef
+# build a better graph (more memory, slower inserts); search_ef is the
+# candidate list per query (recall vs latency). Chroma's own defaults
+# are M=16, construction_ef=100, search_ef=10.
+HNSW_PROFILES = {
+    "fast": {"hnsw:M": 8, "hnsw:construction_ef": 100, "hnsw:search_ef": 32},
+    "balanced": {"hnsw:M": 16, "hnsw:construction_ef": 200, "hnsw:search_ef": 64},
+    "accurate": {"hnsw:M": 32, "hnsw:construction_ef": 400, "hnsw:search_ef": 128},
+}
+
+@lru_cache(maxsize=1)
+def get_default_embedding_function():
+    """
+    Chroma's built-in embedding model, shared process-wide.
+    
+    Each DefaultEmbeddingFunction loads its own copy of the model, so
+    the memory and RAG stores share this one instead.
+    """
+    from chromadb.utils import embedding_functions
+    return embedding_functions.DefaultEmbeddingFunction()
+
+def _is_collection_not_found(error: Exception) -> bool:
+    """
+    Whether get_collection failed only because the collection is missing.
+    
+    Chroma raises NotFoundError (1.x), InvalidCollectionException
+    (0.5-0.6) or a plain ValueError (0.4), each saying "does not exist".
+    Anything else (corrupt store, embedding function or space conflict)
+    is a real failure.
+    """
+    not_found = tuple(
+        getattr(chromadb.errors, name)
+        for name in ("NotFoundError", "InvalidCollectionException")
+        if hasattr(chromadb.errors, name)
+    )
+    if isinstance(error, not_found):
+        return True
+    return type(error) is ValueError and "does not exist" in str(error)
+
 class ChromaVectorStore(VectorStore):
     """
     ChromaDB implementation for vector storage.
@@ -28,23 +75,58 @@ class ChromaVectorStore(VectorStore):
     Stores embeddings of factual information for semantic search.
     """
     
-    def __init__(self, persist_directory: str = "data/chromadb"):
+    def __init__(
+        self,
+        persist_directory: str = "data/chromadb",
+        embedding_function: Optional[Any] = None,
+        hnsw_profile: str = "balanced"
+    ):
+        """
+        Args:
+            persist_directory: Where ChromaDB keeps its files
+            embedding_function: Chroma embedding function (defaults to
+                the shared built-in model, get_default_embedding_function)
+            hnsw_profile: HNSW_PROFILES preset for new collections
+        """
         if not CHROMADB_AVAILABLE:
             raise ImportError(
                 "ChromaDB not installed. Install with: pip install chromadb"
             )
         
+        if hnsw_profile not in HNSW_PROFILES:
+            raise ValueError(
+                f"Unknown HNSW profile '{hnsw_profile}' "
+                f"(expected one of: {', '.join(HNSW_PROFILES)})"
+            )
+        
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
         self.client: Optional[chromadb.ClientAPI] = None
         self.collection = None
         self.collection_name = "memory_facts"
+        self.collection_description = "Memory facts with semantic search"
+        self.embedding_function = embedding_function
+        self.hnsw_profile = hnsw_profile
         
         logger.info(f"ChromaVectorStore initialized (path={persist_directory})")
     
-    def initialize(self):
-        """Initialize ChromaDB client and collection"""
+    def initialize(
+        self,
+        collection_name: Optional[str] = None,
+        description: str = "Memory facts with semantic search"
+    ):
+        """
+        Initialize ChromaDB client and collection.
+        
+        Args:
+            collection_name: Collection to open (defaults to memory facts)
+            description: Collection description used when creating it
+        """
+        if collection_name:
+            self.collection_name = collection_name
+        self.collection_description = description
+        
         try:
             # Create persistent client
             self.client = chromadb.PersistentClient(
@@ -55,11 +137,21 @@ class ChromaVectorStore(VectorStore):
                 )
             )
             
-            # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"description": "Memory facts with semantic search"}
-            )
+            # Open the collection, creating it on first use (get_or_create
+            # would try to change the space of an existing collection)
+            try:
+                self.collection = self.client.get_collection(
+                    name=self.collection_name,
+                    **self._embedding_kwargs()
+                )
+            except Exception as e:
+                if not _is_collection_not_found(e):
+                    raise
+                self.collection = self.client.create_collection(
+                    name=self.collection_name,
+                    metadata=self._collection_metadata(),
+                    **self._embedding_kwargs()
+                )
             
             count = self.collection.count()
             logger.info(f"✅ ChromaDB initialized ({count} embeddings)")
@@ -68,6 +160,20 @@ class ChromaVectorStore(VectorStore):
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
     
+    def _collection_metadata(self) -> Dict[str, Any]:
+        """Metadata for a newly created collection"""
+        return {
+            "description": self.collection_description,
+            "hnsw:space": DISTANCE_SPACE,
+            **HNSW_PROFILES[self.hnsw_profile]
+        }
+    
+    def _embedding_kwargs(self) -> Dict[str, Any]:
+        """Collection arguments selecting the embedding function"""
+        return {
+            "embedding_function": self.embedding_function or get_default_embedding_function()
+        }
+    
     def add_embedding(
         self,
         fact_id: int,
@@ -91,21 +197,12 @@ class ChromaVectorStore(VectorStore):
         # Generate embedding ID
         embedding_id = f"fact_{fact_id}"
         
-        # Prepare metadata (ChromaDB requires string values)
-        chroma_metadata = {
-            "fact_id": str(fact_id),
-            "user_id": str(metadata.get("user_id", "default_user")),
-            "category": str(metadata.get("category", "unknown")),
-            "importance": str(metadata.get("importance", 0.5)),
-            "created_at": metadata.get("created_at", datetime.now().isoformat())
-        }
-        
         # Add to collection (ChromaDB auto-generates embeddings)
         try:
             self.collection.add(
                 ids=[embedding_id],
                 documents=[content],
-                metadatas=[chroma_metadata]
+                metadatas=[self._chroma_metadata(fact_id, metadata)]
             )
             
             logger.debug(f"Added embedding {embedding_id}: {content[:50]}...")
@@ -115,6 +212,58 @@ class ChromaVectorStore(VectorStore):
             logger.error(f"Failed to add embedding: {e}")
             raise
     
+    def add_embeddings(
+        self,
+        entries: List[Tuple[int, str, Dict[str, Any]]]
+    ) -> List[str]:
+        """
+        Add several facts in one collection call.
+        
+        ChromaDB embeds all documents of a call as one batch, so this
+        costs a single embedding pass instead of one per fact.
+        
+        Args:
+            entries: (fact_id, content, metadata) per fact
+            
+        Returns:
+            Embedding IDs, in entry order
+        """
+        if not self.collection:
+            raise RuntimeError("Vector store not initialized")
+        
+        if not entries:
+            return []
+        
+        embedding_ids = [f"fact_{fact_id}" for fact_id, _, _ in entries]
+        
+        try:
+            self.collection.add(
+                ids=embedding_ids,
+                documents=[content for _, content, _ in entries],
+                metadatas=[
+                    self._chroma_metadata(fact_id, metadata)
+                    for fact_id, _, metadata in entries
+                ]
+            )
+            
+            logger.debug(f"Added {len(embedding_ids)} embeddings in one batch")
+            return embedding_ids
+            
+        except Exception as e:
+            logger.error(f"Failed to add embeddings: {e}")
+            raise
+    
+    @staticmethod
+    def _chroma_metadata(fact_id: int, metadata: Dict[str, Any]) -> Dict[str, str]:
+        """Prepare metadata (ChromaDB requires string values)"""
+        return {
+            "fact_id": str(fact_id),
+            "user_id": str(metadata.get("user_id", "default_user")),
+            "category": str(metadata.get("category", "unknown")),
+            "importance": str(metadata.get("importance", 0.5)),
+            "created_at": metadata.get("created_at", datetime.now().isoformat())
+        }
+    
     def search(
         
         self,
@@ -122,7 +271,8 @@ class ChromaVectorStore(VectorStore):
         user_id: str = "default_user",
         limit: int = 5,
         min_similarity: float = 0.0,
-        filter_facts_only: bool = False  # ✅ NEW: Option to filter only facts
+        filter_facts_only: bool = False,  # ✅ NEW: Option to filter only facts
+        query_embedding: Optional[List[float]] = None
     ) -> List[RetrievalResult]:
         """
         Search by semantic similarity.
@@ -135,6 +285,7 @@ class ChromaVectorStore(VectorStore):
             limit: Max results
             min_similarity: Minimum similarity threshold (0-1)
             filter_facts_only: Only return facts (session-agnostic)
+            query_embedding: Precomputed embedding of query (skips embedding)
             
         Returns:
             List of RetrievalResult objects
@@ -144,37 +295,18 @@ class ChromaVectorStore(VectorStore):
         
         try:
             # Query with simple user filter
+            if query_embedding is not None:
+                query_input = {"query_embeddings": [query_embedding]}
+            else:
+                query_input = {"query_texts": [query]}
+            
             results = self.collection.query(
-                query_texts=[query],
+                **query_input,
                 n_results=limit,
                 where={"user_id": user_id}  # ✅ Simple, works
-        )
-            
-            # Parse results
-            retrieval_results = []
+            )
             
-            if results['ids'] and len(results['ids'][0]) > 0:
-                for i in range(len(results['ids'][0])):
-                    # Calculate similarity (ChromaDB returns distances)
-                    distance = results['distances'][0][i] if results['distances'] else 1.0
-                    similarity = 1.0 - min(distance, 1.0)  # Convert distance to similarity
-                    
-                    # Skip if below threshold
-                    if similarity < min_similarity:
-                        continue
-                    
-                    metadata = results['metadatas'][0][i]
-                    
-                    retrieval_results.append(RetrievalResult(
-                        content=results['documents'][0][i],
-                        relevance_score=similarity,
-                        fact_id=int(metadata.get('fact_id', 0)),
-                        session_id=None,  # ✅ Facts are always session-agnostic
-                        category=metadata.get('category'),
-                        importance=float(metadata.get('importance', 0.5)),
-                        created_at=datetime.fromisoformat(metadata['created_at']) if 'created_at' in metadata else None,
-                        source='vector'
-                    ))
+            retrieval_results = self._parse_results(results, 0, min_similarity)
             
             logger.debug(f"Vector search found {len(retrieval_results)} results for: {query}")
             return retrieval_results
@@ -183,6 +315,103 @@ class ChromaVectorStore(VectorStore):
             logger.error(f"Vector search error: {e}")
             return []
     
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        user_id: str = "default_user",
+        limit: int = 5,
+        min_similarity: float = 0.0
+    ) -> List[List[RetrievalResult]]:
+        """
+        Search several precomputed query embeddings in one Chroma query.
+        
+        Args:
+            query_embeddings: One embedding per query
+            user_id: Filter by user
+            limit: Max results per query
+            min_similarity: Minimum similarity threshold (0-1)
+            
+        Returns:
+            One list of RetrievalResult objects per query, in order
+        """
+        if not self.collection:
+            raise RuntimeError("Vector store not initialized")
+        
+        try:
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=limit,
+                where={"user_id": user_id}
+            )
+            
+            batch_results = [
+                self._parse_results(results, i, min_similarity)
+                for i in range(len(query_embeddings))
+            ]
+            
+            logger.debug(f"Batched vector search for {len(query_embeddings)} queries")
+            return batch_results
+            
+        except Exception as e:
+            logger.error(f"Batched vector search error: {e}")
+            return [[] for _ in query_embeddings]
+    
+    def _parse_results(
+        self,
+        results: Dict[str, Any],
+        query_index: int,
+        min_similarity: float
+    ) -> List[RetrievalResult]:
+        """Convert one query's slice of a Chroma query() response"""
+        retrieval_results = []
+        
+        if not results['ids'] or len(results['ids'][query_index]) == 0:
+            return retrieval_results
+        
+        ids = results['ids'][query_index]
+        distances = results['distances'][query_index] if results['distances'] else None
+        documents = results['documents'][query_index]
+        metadatas = results['metadatas'][query_index]
+        
+        for i in range(len(ids)):
+            # Calculate similarity (ChromaDB returns distances)
+            distance = distances[i] if distances else 1.0
+            similarity = 1.0 - min(distance, 1.0)  # Convert distance to similarity
+            
+            # Skip if below threshold
+            if similarity < min_similarity:
+                continue
+            
+            metadata = metadatas[i]
+            
+            retrieval_results.append(RetrievalResult(
+                content=documents[i],
+                relevance_score=similarity,
+                fact_id=int(metadata.get('fact_id', 0)),
+                session_id=None,  # ✅ Facts are always session-agnostic
+                category=metadata.get('category'),
+                importance=float(metadata.get('importance', 0.5)),
+                created_at=datetime.fromisoformat(metadata['created_at']) if 'created_at' in metadata else None,
+                source='vector'
+            ))
+        
+        return retrieval_results
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query with the collection's embedding function.
+        
+        Lets callers cache query embeddings and pass them to search().
+        """
+        if not self.collection:
+            raise RuntimeError("Vector store not initialized")
+        
+        embed = getattr(self.collection, '_embedding_function', None)
+        if embed is None:
+            embed = get_default_embedding_function()
+        
+        return [float(x) for x in embed([query])[0]]
+    
     def delete(self, embedding_id: str):
         """Delete an embedding"""
         if not self.collection:
@@ -264,7 +493,8 @@ class ChromaVectorStore(VectorStore):
             self.client.delete_collection(self.collection_name)
             self.collection = self.client.create_collection(
                 name=self.collection_name,
-                metadata={"description": "Memory facts with semantic search"}
+                metadata=self._collection_metadata(),
+                **self._embedding_kwargs()
             )
             logger.warning("⚠️  Collection reset - all embeddings deleted")
             
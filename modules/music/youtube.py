@@ -7,12 +7,21 @@ No fake streaming - just reliable downloads with proper filename handling
 import os
 import sys
 import re
+import asyncio
 from pathlib import Path
 from typing import Optional
 from utils.logger import get_logger
 
 logger = get_logger('music.youtube')
 
+class _QuietLogger:
+    """Routes yt-dlp output to our logger (errors only)"""
+    def debug(self, msg): pass
+    def info(self, msg): pass
+    def warning(self, msg): pass
+    def error(self, msg):
+        logger.error(f"yt-dlp: {msg}")
+
 class YouTubeStreamer:
     """
     YouTube music downloader with smart caching.
@@ -30,12 +39,31 @@ class YouTubeStreamer:
             import yt_dlp
             self.yt_dlp = yt_dlp
             self.available = True
+            self._warm_extractors()
             logger.info("[OK] YouTube downloader initialized")
         except ImportError:
             logger.warning("[WARN] yt-dlp not installed, YouTube disabled")
             print("[WARN] YouTube: Install with: pip install yt-dlp")
             self.available = False
     
+    def _warm_extractors(self):
+        """
+        Load the YouTube extractors up front.
+        
+        yt-dlp imports extractors and compiles their regexes lazily, so
+        without this the user's first request pays that cost.
+        """
+        try:
+            ydl = self.yt_dlp.YoutubeDL({
+                'quiet': True,
+                'no_warnings': True,
+                'logger': _QuietLogger(),
+            })
+            ydl.get_info_extractor('YoutubeSearch')
+            ydl.get_info_extractor('Youtube')
+        except Exception as e:
+            logger.debug(f"yt-dlp extractor warm-up skipped: {e}")
+    
     def _sanitize_filename(self, filename: str) -> str:
         """
         Sanitize filename to match yt-dlp's sanitization.
@@ -146,13 +174,6 @@ class YouTubeStreamer:
             # Set up output template - let yt-dlp sanitize the title
             output_template = str(self.cache_dir / '%(title)s.%(ext)s')
             
-            class QuietLogger:
-                def debug(self, msg): pass
-                def info(self, msg): pass
-                def warning(self, msg): pass
-                def error(self, msg):
-                    logger.error(f"yt-dlp: {msg}")
-            
             ydl_opts = {
                 'format': 'bestaudio/best',
                 'outtmpl': output_template,
@@ -166,7 +187,7 @@ class YouTubeStreamer:
                 'noplaylist': True,
                 'no_color': True,
                 'noprogress': False,  # Show progress
-                'logger': QuietLogger(),
+                'logger': _QuietLogger(),
                 'nocheckcertificate': True,
             }
             
@@ -212,6 +233,15 @@ class YouTubeStreamer:
             logger.error(traceback.format_exc())
             return None
     
+    async def asearch_and_download(self, query: str, max_wait: int = 120) -> Optional[str]:
+        """
+        Async version of search_and_download.
+        
+        Runs the blocking yt-dlp round-trip in a worker thread so the
+        event loop stays responsive; concurrent queries can be gathered.
+        """
+        return await asyncio.to_thread(self.search_and_download, query, max_wait)
+    
     def get_stream_and_download(self, query: str):
         """
         Legacy method for compatibility.
@@ -229,6 +259,10 @@ class YouTubeStreamer:
         """Legacy method - downloads and returns path"""
         return self.search_and_download(query)
     
+    async def astream_url(self, query: str) -> Optional[str]:
+        """Async version of stream_url"""
+        return await self.asearch_and_download(query)
+    
     def clean_cache(self, max_size_mb: int = 500):
         """Clean cache if it exceeds size limit"""
         try:
@@ -4,13 +4,44 @@ RAG System - Base Interfaces
 Defines core types and interfaces for document retrieval.
 """
 
+import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback for values JSON can't encode natively"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, default=_json_default).encode('utf-8')
+
+
+def _loads(data: Any) -> Any:
+    """Parse JSON from str or bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class DocumentType(Enum):
     """Supported document types"""
     PDF = "pdf"
@@ -27,7 +58,7 @@ class ChunkStrategy(Enum):
     PARAGRAPH = "paragraph"        # By paragraph
     SEMANTIC = "semantic"          # Semantic similarity
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Document:
     """Represents a document"""
     id: Optional[int] = None
@@ -47,6 +78,17 @@ class Document:
     user_id: str = "default_user"
     tags: List[str] = field(default_factory=list)
     
+    # Cached content preview (computed on first to_dict)
+    _preview: Optional[str] = field(default=None, init=False, repr=False)
+    
+    @property
+    def preview(self) -> str:
+        """First 500 chars of content, computed once"""
+        if self._preview is None:
+            # Short content is shared as-is instead of copied by slicing
+            self._preview = self.content if len(self.content) <= 500 else self.content[:500]
+        return self._preview
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return {
@@ -55,7 +97,7 @@ class Document:
             'file_name': self.file_name,
             'file_type': self.file_type.value,
             'title': self.title,
-            'content': self.content[:500],  # Preview only
+            'content': self.preview,  # Preview only
             'metadata': self.metadata,
             'indexed_at': self.indexed_at.isoformat() if self.indexed_at else None,
             'file_size_bytes': self.file_size_bytes,
@@ -63,8 +105,12 @@ class Document:
             'user_id': self.user_id,
             'tags': self.tags
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes"""
+        return _dumps(self.to_dict())
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class DocumentChunk:
     """Represents a chunk of a document"""
     id: Optional[int] = None
@@ -85,7 +131,7 @@ class DocumentChunk:
     # Timestamps
     created_at: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class RAGResult:
     """Result from RAG retrieval"""
     content: str
@@ -113,8 +159,12 @@ class RAGResult:
             'metadata': self.metadata,
             'source_path': self.source_path
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes"""
+        return _dumps(self.to_dict())
 
-@dataclass
+@dataclass(slots=True)
 class IndexStats:
     """Statistics about the document index"""
     total_documents: int = 0
@@ -128,6 +178,11 @@ class IndexStats:
 class DocumentLoader(ABC):
     """Base interface for document loaders"""
     
+    @classmethod
+    def supported_extensions(cls) -> Tuple[str, ...]:
+        """File extensions (lowercase, with dot) this loader handles"""
+        return ()
+    
     @abstractmethod
     def can_load(self, file_path: str) -> bool:
         """Check if this loader can handle the file"""
@@ -137,6 +192,18 @@ class DocumentLoader(ABC):
     def load(self, file_path: str) -> Document:
         """Load a document from file"""
         pass
+    
+    def stream(self, file_path: str) -> Tuple[Document, Iterator[str]]:
+        """
+        Load a document's metadata and stream its text in parts.
+        
+        The returned Document has empty content; joining the parts
+        gives the same text load() would. Loaders that can read
+        incrementally override this.
+        """
+        document = self.load(file_path)
+        content, document.content = document.content, ""
+        return document, iter((content,))
 
 class TextChunker(ABC):
     """Base interface for text chunking"""
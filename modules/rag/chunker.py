@@ -4,13 +4,25 @@ Text Chunker - Smart Document Splitting
 Splits documents into chunks for embedding.
 """
 
+import logging
+import multiprocessing
+import os
 import re
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
 from modules.rag.base import TextChunker, ChunkStrategy
 from utils.logger import get_logger
 
 logger = get_logger('rag.chunker')
 
+# Buffered text size before chunk_stream emits chunks
+STREAM_FLUSH_CHARS = 1 << 16  # 64K chars
+
+# Where chunk_stream may cut buffered text without changing the units
+# (words, sentences, paragraphs) each strategy splits it into
+_WORD_BREAK_RE = re.compile(r'\s+')
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
 class SmartChunker(TextChunker):
     """
     Intelligent text chunking with overlap.
@@ -53,6 +65,149 @@ class SmartChunker(TextChunker):
         else:  # FIXED_SIZE
             return self._chunk_fixed_size(text, chunk_size)
     
+    def chunk_stream(self, parts: Iterable[str], chunk_size: int = None) -> Iterator[str]:
+        """
+        Chunk text that arrives in pieces (file blocks, PDF pages).
+        
+        Yields exactly the chunks chunk() would return for the joined
+        text. Buffered text is only cut between whole units (sentences,
+        paragraphs or words, per strategy), and the open chunk's state
+        carries over, so memory stays bounded by the open chunk plus the
+        longest unit regardless of document size.
+        
+        Args:
+            parts: Text pieces; concatenated they form the document
+            chunk_size: Override default chunk size
+            
+        Yields:
+            Text chunks
+        """
+        chunk_size = chunk_size or self.chunk_size
+        
+        if self.strategy == ChunkStrategy.SENTENCE:
+            return self._stream_by_sentences(parts, chunk_size)
+        elif self.strategy == ChunkStrategy.PARAGRAPH:
+            return self._stream_by_paragraphs(parts, chunk_size)
+        else:  # FIXED_SIZE
+            return self._stream_fixed_size(parts, chunk_size)
+    
+    @staticmethod
+    def _stream_blocks(parts: Iterable[str], boundary: "re.Pattern") -> Iterator[str]:
+        """
+        Regroup streamed text into blocks that end where a unit ends.
+        
+        Text builds up to STREAM_FLUSH_CHARS and is then cut where the
+        last boundary match starts. Matches before that point are final
+        (later text can't change them), so splitting each block gives the
+        same units as splitting the whole text.
+        """
+        buffer = ""
+        flush_at = STREAM_FLUSH_CHARS
+        
+        for part in parts:
+            buffer += part
+            if len(buffer) < flush_at:
+                continue
+            
+            cut = 0
+            for match in boundary.finditer(buffer):
+                cut = match.start()
+            if not cut:
+                # One long unit so far; look again after as much new text
+                flush_at = len(buffer) + STREAM_FLUSH_CHARS
+                continue
+            
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+            flush_at = STREAM_FLUSH_CHARS
+        
+        if buffer:
+            yield buffer
+    
+    def _stream_by_sentences(self, parts: Iterable[str], chunk_size: int) -> Iterator[str]:
+        """Streaming _chunk_by_sentences"""
+        sentences: List[str] = []
+        lengths: List[int] = []
+        start = current_length = 0
+        
+        for block in self._stream_blocks(parts, _SENTENCE_BREAK_RE):
+            new = self._split_sentences(block)
+            first = len(sentences)
+            sentences.extend(new)
+            lengths.extend(len(sentence.split()) for sentence in new)
+            
+            chunks: List[str] = []
+            start, current_length = self._pack_sentences(
+                sentences, lengths, chunk_size, chunks, first, start, current_length
+            )
+            yield from chunks
+            
+            # Only the open chunk's sentences matter from here on
+            del sentences[:start]
+            del lengths[:start]
+            start = 0
+        
+        if start < len(sentences):
+            yield " ".join(sentences[start:])
+    
+    def _stream_by_paragraphs(self, parts: Iterable[str], chunk_size: int) -> Iterator[str]:
+        """Streaming _chunk_by_paragraphs"""
+        current_chunk: List[str] = []
+        current_length = 0
+        
+        for block in self._stream_blocks(parts, _PARAGRAPH_BREAK_RE):
+            chunks: List[str] = []
+            current_length = self._pack_paragraphs(
+                self._split_paragraphs(block), chunk_size, chunks, current_chunk, current_length
+            )
+            yield from chunks
+        
+        if current_chunk:
+            yield "\n\n".join(current_chunk)
+    
+    def _stream_fixed_size(self, parts: Iterable[str], chunk_size: int) -> Iterator[str]:
+        """Streaming _chunk_fixed_size"""
+        step = max(1, chunk_size - max(10, self.overlap))
+        words: List[str] = []
+        emitted = False
+        
+        for block in self._stream_blocks(parts, _WORD_BREAK_RE):
+            words.extend(block.split())
+            
+            # A full window is final; the next one starts `step` words on
+            while len(words) >= chunk_size:
+                yield " ".join(words[:chunk_size])
+                emitted = True
+                del words[:step]
+        
+        # Last partial window, unless the previous window already reached the end
+        if words and (not emitted or len(words) > chunk_size - step):
+            yield " ".join(words)
+    
+    def chunk_many(self, texts: List[str], workers: Optional[int] = None) -> List[List[str]]:
+        """
+        Chunk a batch of texts across worker processes.
+        
+        Chunking is CPU-bound regex work, so threads would serialize on
+        the GIL. Small batches are chunked in-process since pool startup
+        would cost more than it saves.
+        
+        Args:
+            texts: Texts to chunk
+            workers: Number of processes (default: CPU count)
+            
+        Returns:
+            List of chunk lists, in the same order as texts
+        """
+        workers = workers or os.cpu_count() or 1
+        
+        if len(texts) < 8 or workers == 1:
+            return [self.chunk(text) for text in texts]
+        
+        chunksize = max(1, len(texts) // (workers * 4))
+        with multiprocessing.Pool(workers) as pool:
+            return pool.map(self.chunk, texts, chunksize=chunksize)
+    
     def _chunk_by_sentences(self, text: str, chunk_size: int) -> List[str]:
         """Chunk by sentence boundaries with overlap"""
         
@@ -62,62 +217,101 @@ class SmartChunker(TextChunker):
         if not sentences:
             return []
         
+        # Word counts once, up front
+        lengths = [len(sentence.split()) for sentence in sentences]
+        
         chunks = []
-        current_chunk = []
-        current_length = 0
+        start, _ = self._pack_sentences(sentences, lengths, chunk_size, chunks)
+        
+        # Add final chunk
+        if start < len(sentences):
+            chunks.append(" ".join(sentences[start:]))
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            avg = sum(len(c.split()) for c in chunks) / len(chunks)
+            logger.debug(f"Split text into {len(chunks)} chunks (avg: {avg:.0f} words)")
         
-        for i, sentence in enumerate(sentences):
-            sentence_length = len(sentence.split())
+        return chunks
+    
+    def _pack_sentences(
+        self,
+        sentences: List[str],
+        lengths: List[int],
+        chunk_size: int,
+        chunks: List[str],
+        first: int = 0,
+        start: int = 0,
+        current_length: int = 0
+    ) -> Tuple[int, int]:
+        """
+        Pack sentences[first:] into chunks, appending finished ones.
+        
+        A chunk is always a run of consecutive sentences, tracked as
+        sentences[start:i]. The chunk still open at the end is left to
+        the caller; returns its (start, current_length) so packing can
+        resume once more sentences are appended.
+        """
+        for i in range(first, len(sentences)):
+            sentence_length = lengths[i]
             
             # If single sentence is too long, split it
             if sentence_length > chunk_size:
                 # Add current chunk if exists
-                if current_chunk:
-                    chunks.append(" ".join(current_chunk))
-                    current_chunk = []
-                    current_length = 0
+                if i > start:
+                    chunks.append(" ".join(sentences[start:i]))
                 
                 # Split long sentence into fixed-size chunks
-                long_chunks = self._chunk_fixed_size(sentence, chunk_size)
-                chunks.extend(long_chunks)
+                chunks.extend(self._chunk_fixed_size(sentences[i], chunk_size))
+                start = i + 1
+                current_length = 0
                 continue
             
             # Check if adding this sentence exceeds limit
             if current_length + sentence_length > chunk_size:
                 # Save current chunk
-                if current_chunk:
-                    chunks.append(" ".join(current_chunk))
+                if i > start:
+                    chunks.append(" ".join(sentences[start:i]))
                 
-                # Start new chunk with overlap
-                overlap_sentences = self._get_overlap_sentences(
-                    current_chunk, 
-                    self.overlap
-                )
-                current_chunk = overlap_sentences + [sentence]
-                current_length = sum(len(s.split()) for s in current_chunk)
+                # Start new chunk with up to `overlap` words of trailing sentences
+                j = i
+                overlap_length = 0
+                while j > start and overlap_length + lengths[j - 1] <= self.overlap:
+                    j -= 1
+                    overlap_length += lengths[j]
+                start = j
+                current_length = overlap_length + sentence_length
             else:
-                current_chunk.append(sentence)
                 current_length += sentence_length
         
-        # Add final chunk
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
-        
-        logger.debug(f"Split text into {len(chunks)} chunks (avg: {sum(len(c.split()) for c in chunks) / len(chunks):.0f} words)")
-        
-        return chunks
+        return start, current_length
     
     def _chunk_by_paragraphs(self, text: str, chunk_size: int) -> List[str]:
         """Chunk by paragraph boundaries"""
         
-        # Split by double newlines
-        paragraphs = re.split(r'\n\s*\n', text)
-        paragraphs = [p.strip() for p in paragraphs if p.strip()]
-        
         chunks = []
         current_chunk = []
-        current_length = 0
+        self._pack_paragraphs(self._split_paragraphs(text), chunk_size, chunks, current_chunk, 0)
         
+        # Add final chunk
+        if current_chunk:
+            chunks.append("\n\n".join(current_chunk))
+        
+        return chunks
+    
+    def _pack_paragraphs(
+        self,
+        paragraphs: List[str],
+        chunk_size: int,
+        chunks: List[str],
+        current_chunk: List[str],
+        current_length: int
+    ) -> int:
+        """
+        Pack paragraphs into chunks, appending finished ones.
+        
+        The open chunk's paragraphs stay in current_chunk (updated in
+        place); returns its word count so packing can resume.
+        """
         for para in paragraphs:
             para_length = len(para.split())
             
@@ -125,7 +319,7 @@ class SmartChunker(TextChunker):
             if para_length > chunk_size:
                 if current_chunk:
                     chunks.append("\n\n".join(current_chunk))
-                    current_chunk = []
+                    current_chunk.clear()
                     current_length = 0
                 
                 # Split long paragraph
@@ -137,38 +331,37 @@ class SmartChunker(TextChunker):
             if current_length + para_length > chunk_size:
                 if current_chunk:
                     chunks.append("\n\n".join(current_chunk))
-                current_chunk = [para]
+                current_chunk[:] = [para]
                 current_length = para_length
             else:
                 current_chunk.append(para)
                 current_length += para_length
         
-        # Add final chunk
-        if current_chunk:
-            chunks.append("\n\n".join(current_chunk))
-        
-        return chunks
+        return current_length
+    
+    @staticmethod
+    def _split_paragraphs(text: str) -> List[str]:
+        """Split text into paragraphs (blank-line separated)"""
+        paragraphs = _PARAGRAPH_BREAK_RE.split(text)
+        return [p.strip() for p in paragraphs if p.strip()]
     
     def _chunk_fixed_size(self, text: str, chunk_size: int) -> List[str]:
         """Simple fixed-size chunking with overlap"""
         
         words = text.split()
-        chunks = []
+        n = len(words)
+        if n == 0:
+            return []
         
         overlap_words = max(10, self.overlap)  # At least 10 words overlap
         
-        i = 0
-        while i < len(words):
-            chunk_words = words[i:i + chunk_size]
-            chunks.append(" ".join(chunk_words))
-            
-            # Move forward by chunk_size minus overlap
-            i += chunk_size - overlap_words
-            
-            if i >= len(words):
-                break
+        # Move forward by chunk_size minus overlap
+        step = max(1, chunk_size - overlap_words)
         
-        return chunks
+        # Stop once a chunk reaches the end (no redundant tail chunks)
+        count = 1 if n <= chunk_size else -(-(n - chunk_size) // step) + 1
+        
+        return [" ".join(words[k * step:k * step + chunk_size]) for k in range(count)]
     
     def _split_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
@@ -182,27 +375,6 @@ class SmartChunker(TextChunker):
         
         return sentences
     
-    def _get_overlap_sentences(self, sentences: List[str], overlap_tokens: int) -> List[str]:
-        """Get last N tokens worth of sentences for overlap"""
-        
-        if not sentences:
-            return []
-        
-        overlap_sentences = []
-        token_count = 0
-        
-        # Start from end and work backwards
-        for sentence in reversed(sentences):
-            sentence_tokens = len(sentence.split())
-            
-            if token_count + sentence_tokens > overlap_tokens:
-                break
-            
-            overlap_sentences.insert(0, sentence)
-            token_count += sentence_tokens
-        
-        return overlap_sentences
-    
     def estimate_chunks(self, text: str) -> int:
         """Estimate how many chunks will be created"""
         word_count = len(text.split())
@@ -4,18 +4,207 @@ Document Indexer - Process and Store Documents
 Handles document loading, chunking, and indexing for RAG retrieval.
 """
 
+import hashlib
+import io
+import multiprocessing.util
+import os
 import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, FrozenSet, Iterator, Optional, List, Tuple
 from datetime import datetime
 
-from modules.rag.base import Document, DocumentChunk, IndexStats
+from modules.rag.base import Document, DocumentChunk, DocumentType, IndexStats, _dumps, _loads
 from modules.rag.loaders import get_loader_registry
-from modules.rag.chunker import get_chunker
+from modules.rag.chunker import get_chunker, SmartChunker
 from utils.logger import get_logger
 
 logger = get_logger('rag.indexer')
 
+# Chunks buffered before each bulk insert during streaming ingestion
+CHUNK_FLUSH_SIZE = 256
+
+# How long get_stats results are reused when nothing was written
+STATS_TTL_SECONDS = 10.0
+
+# SQL statements (kept as constants so every call reuses the same text
+# and hits the connection's prepared-statement cache)
+
+_INSERT_DOC_SQL = """
+    INSERT INTO documents (
+        file_path, file_name, file_type, title, content,
+        metadata, user_id, tags, indexed_at, file_size_bytes, num_chunks
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_DOC_CONTENT_SQL = "UPDATE documents SET content = ?, num_chunks = ? WHERE id = ?"
+
+# Chunk text lives once per distinct content in chunk_contents;
+# document_chunks rows reference it by hash and keep content empty
+_INSERT_CHUNK_SQL = """
+    INSERT INTO document_chunks (
+        document_id, content, content_hash, chunk_index, start_char, end_char,
+        metadata, embedding_id, created_at
+    ) VALUES (?, '', ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_CHUNK_CONTENT_SQL = "INSERT OR IGNORE INTO chunk_contents (hash, content) VALUES (?, ?)"
+
+# The partial index covers this query (deleted_at is indexed so SQLite
+# needn't read the row); the planner would otherwise pick the UNIQUE
+# index and fetch the full row
+_SELECT_DOC_ID_BY_PATH_SQL = """
+    SELECT id FROM documents INDEXED BY idx_docs_path_live 
+    WHERE file_path = ? AND deleted_at IS NULL
+"""
+
+_DOC_META_COLUMNS = """
+    id, file_path, file_name, file_type, title,
+    metadata, user_id, tags, indexed_at, file_size_bytes, num_chunks
+"""
+
+_SELECT_DOC_BY_PATH_SQL = f"""
+    SELECT {_DOC_META_COLUMNS}, content FROM documents 
+    WHERE file_path = ? AND deleted_at IS NULL
+"""
+
+_SELECT_DOC_META_BY_PATH_SQL = f"""
+    SELECT {_DOC_META_COLUMNS}, '' AS content FROM documents 
+    WHERE file_path = ? AND deleted_at IS NULL
+"""
+
+_SELECT_DOC_META_IN_RANGE_SQL = f"""
+    SELECT {_DOC_META_COLUMNS}, '' AS content FROM documents 
+    WHERE file_path >= ? AND file_path < ? AND deleted_at IS NULL
+"""
+
+_SELECT_CHUNK_TEXTS_SQL = """
+    SELECT COALESCE(cc.content, c.content) AS content
+    FROM document_chunks c
+    LEFT JOIN chunk_contents cc ON cc.hash = c.content_hash
+    WHERE c.document_id = ?
+    ORDER BY c.chunk_index
+"""
+
+# documents_fts indexes chunks (rowid = chunk id); its external content
+# is this view, which resolves deduplicated chunk text
+_FTS_SOURCE_VIEW_SQL = """
+    CREATE VIEW IF NOT EXISTS chunk_fts_source AS
+    SELECT c.id AS id, d.title AS title,
+           COALESCE(cc.content, c.content) AS content, d.deleted_at AS deleted_at
+    FROM document_chunks c
+    JOIN documents d ON d.id = c.document_id
+    LEFT JOIN chunk_contents cc ON cc.hash = c.content_hash
+"""
+
+_FTS_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+        title,
+        content,
+        content='chunk_fts_source',
+        content_rowid='id',
+        tokenize='porter unicode61'
+    )
+"""
+
+_SELECT_FTS_HIGH_WATER_SQL = "SELECT value FROM index_meta WHERE key = 'fts_high_water'"
+
+_UPDATE_FTS_HIGH_WATER_SQL = """
+    UPDATE index_meta SET value = (SELECT COALESCE(MAX(id), 0) FROM document_chunks)
+    WHERE key = 'fts_high_water'
+"""
+
+_INSERT_FTS_SINCE_SQL = """
+    INSERT INTO documents_fts (rowid, title, content)
+    SELECT id, title, content FROM chunk_fts_source
+    WHERE id > ? AND deleted_at IS NULL
+"""
+
+_STATS_DOCS_SQL = """
+    SELECT COUNT(*) as count, SUM(file_size_bytes) as total, MAX(indexed_at) as last
+    FROM documents 
+    WHERE deleted_at IS NULL
+"""
+
+_STATS_CHUNKS_SQL = """
+    SELECT COUNT(*) as count FROM document_chunks c
+    JOIN documents d ON c.document_id = d.id
+    WHERE d.deleted_at IS NULL
+"""
+
+_STATS_BY_TYPE_SQL = """
+    SELECT file_type, COUNT(*) as count FROM documents 
+    WHERE deleted_at IS NULL
+    GROUP BY file_type
+"""
+
+
+def _iter_supported(root: str, recursive: bool, exts: FrozenSet[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (absolute path, lowercased extension) of files under root with
+    a supported extension.
+    
+    Walks with os.scandir and filters on the entry name first; the
+    dirent type is used for file/dir checks, so only symlinks cost a
+    stat. Symlinked files are indexed; symlinked directories are not
+    descended into (avoids cycles).
+    """
+    stack = [os.path.abspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                else:
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in exts and entry.is_file():
+                        yield entry.path, ext
+
+
+def _content_hash(text: str) -> bytes:
+    """SHA-256 digest identifying a chunk's text"""
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+# Read-only connection of a parser worker process (see _init_worker)
+_worker_conn: Optional[sqlite3.Connection] = None
+
+
+def _init_worker(db_path: str):
+    """
+    Process pool initializer: open one read-only connection per worker.
+    
+    Workers use it to skip files another writer indexed after the scan;
+    WAL lets these reads run alongside the parent's writes.
+    """
+    global _worker_conn
+    _worker_conn = sqlite3.connect(
+        Path(db_path).resolve().as_uri() + "?mode=ro", uri=True
+    )
+    # atexit doesn't run in pool workers; multiprocessing finalizers do
+    multiprocessing.util.Finalize(None, _worker_conn.close, exitpriority=10)
+
+
+def _parse_and_chunk(
+    file_path: str,
+    chunker: SmartChunker,
+    ext: Optional[str] = None
+) -> Optional[Tuple[Document, List[str]]]:
+    """
+    Load and chunk a single file.
+    
+    Module-level so it can run in a worker process; SQLite writes stay
+    in the parent. Returns None if the file is already indexed.
+    """
+    if _worker_conn is not None:
+        if _worker_conn.execute(_SELECT_DOC_ID_BY_PATH_SQL, (file_path,)).fetchone():
+            return None
+    
+    document = get_loader_registry().load_document(file_path, ext)
+    return document, chunker.chunk(document.content)
+
 class DocumentIndexer:
     """
     Indexes documents for RAG retrieval.
@@ -27,11 +216,26 @@ class DocumentIndexer:
     4. Generate embeddings (via vector store)
     """
     
-    def __init__(self, db_path: str = "data/rag_documents.db"):
+    def __init__(
+        self,
+        db_path: str = "data/rag_documents.db",
+        keep_full_content: bool = False
+    ):
+        """
+        Args:
+            db_path: SQLite database path
+            keep_full_content: Also store each document's full text in
+                documents.content (chunks alone are kept by default)
+        """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.keep_full_content = keep_full_content
         
         self.conn: Optional[sqlite3.Connection] = None
+        
+        # get_stats result, reused briefly (cleared on close)
+        self._stats_cache: Optional[Tuple[float, IndexStats]] = None
+        
         self.loader_registry = get_loader_registry()
         self.chunker = get_chunker()
         
@@ -40,10 +244,28 @@ class DocumentIndexer:
         logger.info(f"DocumentIndexer initialized (db={self.db_path})")
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
+        """
+        Get database connection.
+        
+        Tuned for write-heavy ingestion: WAL journal (readers don't block
+        the writer), NORMAL sync, 64MB page cache, in-memory temp tables
+        and 256MB mmap. WAL keeps `-wal`/`-shm` files next to the database.
+        New databases use incremental auto-vacuum (see vacuum_analyze);
+        that pragma must precede the WAL switch and is a no-op on
+        existing files.
+        """
         if self.conn is None:
             self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
             self.conn.row_factory = sqlite3.Row
+            self.conn.executescript("""
+                PRAGMA auto_vacuum=INCREMENTAL;
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA cache_size=-65536;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA mmap_size=268435456;
+                PRAGMA foreign_keys=ON;
+            """)
         return self.conn
     
     def _initialize_db(self):
@@ -82,6 +304,10 @@ class DocumentIndexer:
             CREATE INDEX IF NOT EXISTS idx_docs_type 
             ON documents(file_type, indexed_at DESC)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_docs_path_live 
+            ON documents(file_path, deleted_at) WHERE deleted_at IS NULL
+        """)
         
         # Chunks table
         cursor.execute("""
@@ -98,12 +324,26 @@ class DocumentIndexer:
                 embedding_id TEXT,
                 
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                content_hash BLOB REFERENCES chunk_contents(hash),
                 
                 FOREIGN KEY (document_id) REFERENCES documents(id),
                 UNIQUE(document_id, chunk_index)
             )
         """)
         
+        # Distinct chunk texts, keyed by SHA-256 (shared across documents)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_contents (
+                hash BLOB PRIMARY KEY,
+                content TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        
+        # Older databases store chunk text inline; add the reference column
+        chunk_columns = {row['name'] for row in cursor.execute("PRAGMA table_info(document_chunks)")}
+        if 'content_hash' not in chunk_columns:
+            cursor.execute("ALTER TABLE document_chunks ADD COLUMN content_hash BLOB REFERENCES chunk_contents(hash)")
+        
         # Indexes for chunks
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_chunks_doc 
@@ -114,40 +354,40 @@ class DocumentIndexer:
             ON document_chunks(embedding_id)
         """)
         
-        # FTS5 for document search
+        # Small key/value table for indexer bookkeeping
         cursor.execute("""
-            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
-                title,
-                content,
-                content='documents',
-                content_rowid='id'
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
             )
         """)
         
-        # Triggers for FTS
-        cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS documents_fts_insert 
-            AFTER INSERT ON documents BEGIN
-                INSERT INTO documents_fts(rowid, title, content) 
-                VALUES (new.id, new.title, new.content);
-            END
-        """)
+        # FTS5 over chunks. Older databases indexed whole documents
+        # (documents.content); drop that table and rebuild from chunks.
+        cursor.execute("DROP TRIGGER IF EXISTS documents_fts_insert")
+        cursor.execute("DROP TRIGGER IF EXISTS documents_fts_delete")
+        cursor.execute("DROP TRIGGER IF EXISTS documents_fts_update")
         
-        cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS documents_fts_delete 
-            AFTER DELETE ON documents BEGIN
-                DELETE FROM documents_fts WHERE rowid = old.id;
-            END
-        """)
+        row = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'documents_fts'"
+        ).fetchone()
+        migrate_fts = row is not None and 'chunk_fts_source' not in row['sql']
+        if migrate_fts:
+            cursor.execute("DROP TABLE documents_fts")
+        
+        cursor.execute(_FTS_SOURCE_VIEW_SQL)
+        cursor.execute(_FTS_TABLE_SQL)
         
+        # The FTS index is refreshed in batches (rebuild_fts_incremental);
+        # chunks up to the high-water id are already indexed
         cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS documents_fts_update 
-            AFTER UPDATE ON documents BEGIN
-                UPDATE documents_fts 
-                SET title = new.title, content = new.content 
-                WHERE rowid = new.id;
-            END
+            INSERT OR IGNORE INTO index_meta (key, value)
+            VALUES ('fts_high_water', 0)
         """)
+        if migrate_fts:
+            cursor.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
+            cursor.execute(_UPDATE_FTS_HIGH_WATER_SQL)
+            logger.info("FTS index migrated to chunk-level search")
         
         conn.commit()
         logger.info("Database schema initialized")
@@ -156,7 +396,10 @@ class DocumentIndexer:
         self,
         file_path: str,
         user_id: str = "default_user",
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        skip_dedup: bool = False,
+        refresh_fts: bool = True,
+        ext: Optional[str] = None
     ) -> Document:
         """
         Index a document.
@@ -165,52 +408,114 @@ class DocumentIndexer:
             file_path: Path to document
             user_id: User ID
             tags: Optional tags
+            skip_dedup: Caller already checked the path isn't indexed
+            refresh_fts: Add the document to the search index now
+                (batch callers refresh once at the end instead)
+            ext: Lowercased extension, if the caller already has it
             
         Returns:
             Document object with ID
         """
-        path = Path(file_path)
-        
-        if not path.exists():
+        if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
         # Check if already indexed
-        existing = self._get_document_by_path(str(path.absolute()))
-        if existing:
-            logger.info(f"Document already indexed: {path.name} (id={existing.id})")
+        abs_path = os.path.abspath(file_path)
+        name = os.path.basename(abs_path)
+        existing = None if skip_dedup else self._get_document_by_path(abs_path, include_content=False)
+        if existing is not None:
+            logger.info(f"Document already indexed: {name} (id={existing.id})")
             return existing
         
-        # Load document
-        logger.info(f"Loading document: {path.name}")
-        document = self.loader_registry.load_document(str(path))
+        # Load document lazily - text is read as it is chunked
+        logger.info(f"Loading document: {name}")
+        document, parts = self.loader_registry.stream_document(abs_path, ext)
         
         # Set user info
         document.user_id = user_id
         document.tags = tags or []
         document.indexed_at = datetime.now()
         
-        # Chunk the document
+        # Only collect the full text if it is kept alongside the chunks
+        content = io.StringIO() if self.keep_full_content else None
+        
+        def tee_parts():
+            for part in parts:
+                content.write(part)
+                yield part
+        
+        # Store document, then stream chunks in bounded batches,
+        # all in one transaction
         logger.info(f"Chunking document...")
-        chunks = self.chunker.chunk(document.content)
-        document.num_chunks = len(chunks)
+        with self._get_connection() as conn:
+            doc_id = self._store_document(document)
+            document.id = doc_id
+            
+            created_at = datetime.now()
+            batch: List[DocumentChunk] = []
+            num_chunks = 0
+            
+            for chunk_text in self.chunker.chunk_stream(tee_parts() if content else parts):
+                batch.append(DocumentChunk(
+                    document_id=doc_id,
+                    content=chunk_text,
+                    chunk_index=num_chunks,
+                    created_at=created_at
+                ))
+                num_chunks += 1
+                
+                if len(batch) >= CHUNK_FLUSH_SIZE:
+                    self._store_chunks_bulk(batch)
+                    batch.clear()
+            
+            if batch:
+                self._store_chunks_bulk(batch)
+            
+            if content:
+                document.content = content.getvalue()
+                content.close()
+            document.num_chunks = num_chunks
+            
+            conn.execute(_UPDATE_DOC_CONTENT_SQL, (document.content, num_chunks, doc_id))
         
-        logger.info(f"Created {len(chunks)} chunks")
+        if refresh_fts:
+            self.rebuild_fts_incremental()
         
-        # Store document in SQL
-        doc_id = self._store_document(document)
-        document.id = doc_id
+        logger.info(f"Indexed document: {name} (id={doc_id}, chunks={num_chunks})")
         
-        # Store chunks
-        for i, chunk_text in enumerate(chunks):
-            chunk = DocumentChunk(
-                document_id=doc_id,
-                content=chunk_text,
-                chunk_index=i,
-                created_at=datetime.now()
-            )
-            self._store_chunk(chunk)
+        return document
+    
+    def _store_indexed(
+        self,
+        document: Document,
+        chunks: List[str],
+        user_id: str = "default_user",
+        tags: Optional[List[str]] = None
+    ) -> Document:
+        """Store a loaded and chunked document"""
+        # Set user info
+        document.user_id = user_id
+        document.tags = tags or []
+        document.indexed_at = datetime.now()
+        document.num_chunks = len(chunks)
         
-        logger.info(f"Indexed document: {path.name} (id={doc_id}, chunks={len(chunks)})")
+        # Store document and chunks in one transaction
+        with self._get_connection():
+            doc_id = self._store_document(document)
+            document.id = doc_id
+            
+            created_at = datetime.now()
+            self._store_chunks_bulk([
+                DocumentChunk(
+                    document_id=doc_id,
+                    content=chunk_text,
+                    chunk_index=i,
+                    created_at=created_at
+                )
+                for i, chunk_text in enumerate(chunks)
+            ])
+        
+        logger.info(f"Indexed document: {document.file_name} (id={doc_id}, chunks={len(chunks)})")
         
         return document
     
@@ -218,131 +523,294 @@ class DocumentIndexer:
         self,
         directory: str,
         recursive: bool = True,
-        user_id: str = "default_user"
+        user_id: str = "default_user",
+        max_workers: Optional[int] = None
     ) -> List[Document]:
         """
         Index all documents in a directory.
         
+        Collects iter_index_directory() into a list; prefer the iterator
+        for large directories.
+        
         Args:
             directory: Directory path
             recursive: Search subdirectories
             user_id: User ID
+            max_workers: Parser processes (default: half the CPU count)
             
         Returns:
             List of indexed documents
         """
+        return list(self.iter_index_directory(
+            directory, recursive=recursive, user_id=user_id, max_workers=max_workers
+        ))
+    
+    def iter_index_directory(
+        self,
+        directory: str,
+        recursive: bool = True,
+        user_id: str = "default_user",
+        max_workers: Optional[int] = None
+    ) -> Iterator[Document]:
+        """
+        Index all documents in a directory, yielding each as it is stored.
+        
+        Parsing and chunking run in a process pool; database writes
+        stay on the calling thread. Already-indexed documents are
+        yielded first, then new ones in completion order.
+        
+        Args:
+            directory: Directory path
+            recursive: Search subdirectories
+            user_id: User ID
+            max_workers: Parser processes (default: half the CPU count)
+            
+        Yields:
+            Indexed documents
+        """
         dir_path = Path(directory)
         
         if not dir_path.exists():
             raise FileNotFoundError(f"Directory not found: {directory}")
         
+        return self._iter_index_directory(directory, recursive, user_id, max_workers)
+    
+    def _iter_index_directory(
+        self,
+        directory: str,
+        recursive: bool,
+        user_id: str,
+        max_workers: Optional[int]
+    ) -> Iterator[Document]:
+        """Generator behind iter_index_directory"""
         logger.info(f"Indexing directory: {directory} (recursive={recursive})")
         
-        # Get all supported files
-        pattern = "**/*" if recursive else "*"
-        all_files = list(dir_path.glob(pattern))
+        # Walk supported files, setting aside ones already indexed
+        supported_exts = frozenset(self.loader_registry.get_supported_extensions())
+        already = self._get_documents_under(directory)
+        
+        num_docs = 0
+        pending = []
+        for file_path, ext in _iter_supported(directory, recursive, supported_exts):
+            existing = already.get(file_path)
+            if existing:
+                logger.info(f"Document already indexed: {os.path.basename(file_path)} (id={existing.id})")
+                num_docs += 1
+                yield existing
+            else:
+                pending.append((file_path, ext))
+        del already
+        
+        logger.info(f"Found {num_docs + len(pending)} documents ({len(pending)} to index)")
+        
+        max_workers = max_workers or max(1, (os.cpu_count() or 1) // 2)
+        
+        try:
+            if len(pending) <= 1 or max_workers == 1:
+                # Not worth starting worker processes
+                for file_path, ext in pending:
+                    try:
+                        doc = self.index_document(
+                            file_path, user_id=user_id, skip_dedup=True, refresh_fts=False, ext=ext
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to index {file_path}: {e}")
+                        continue
+                    num_docs += 1
+                    yield doc
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=_init_worker,
+                    initargs=(str(self.db_path),)
+                ) as pool:
+                    futures = {
+                        pool.submit(_parse_and_chunk, file_path, self.chunker, ext): file_path
+                        for file_path, ext in pending
+                    }
+                    try:
+                        for future in as_completed(futures):
+                            file_path = futures[future]
+                            try:
+                                result = future.result()
+                                if result is None:
+                                    logger.info(f"Document indexed elsewhere meanwhile: {os.path.basename(file_path)}")
+                                    continue
+                                document, chunks = result
+                                doc = self._store_indexed(document, chunks, user_id=user_id)
+                            except Exception as e:
+                                logger.error(f"Failed to index {file_path}: {e}")
+                                continue
+                            num_docs += 1
+                            yield doc
+                    finally:
+                        # Consumer stopped early: don't parse the rest
+                        pool.shutdown(cancel_futures=True)
+        finally:
+            # Make whatever was stored searchable, even if iteration stopped early
+            if pending:
+                self.rebuild_fts_incremental()
+                # Refresh planner statistics for tables that changed enough
+                self._get_connection().execute("PRAGMA optimize")
+            
+            logger.info(f"Indexed {num_docs} documents from {directory}")
+    
+    def rebuild_fts_incremental(self) -> int:
+        """
+        Add chunks stored since the last refresh to the FTS index.
         
-        supported_exts = self.loader_registry.get_supported_extensions()
-        files_to_index = [
-            f for f in all_files 
-            if f.is_file() and f.suffix.lower() in supported_exts
-        ]
+        Returns:
+            Number of chunks added
+        """
+        with self._get_connection() as conn:
+            high_water = conn.execute(_SELECT_FTS_HIGH_WATER_SQL).fetchone()['value']
+            added = conn.execute(_INSERT_FTS_SINCE_SQL, (high_water,)).rowcount
+            conn.execute(_UPDATE_FTS_HIGH_WATER_SQL)
         
-        logger.info(f"Found {len(files_to_index)} documents to index")
+        if added:
+            logger.debug(f"FTS index refreshed: {added} chunks")
         
-        indexed_docs = []
-        for file_path in files_to_index:
-            try:
-                doc = self.index_document(str(file_path), user_id=user_id)
-                indexed_docs.append(doc)
-            except Exception as e:
-                logger.error(f"Failed to index {file_path}: {e}")
+        return added
+    
+    def rebuild_fts(self):
+        """Rebuild the whole FTS index from the stored chunks"""
+        with self._get_connection() as conn:
+            conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
+            conn.execute(_UPDATE_FTS_HIGH_WATER_SQL)
         
-        logger.info(f"Indexed {len(indexed_docs)} documents from {directory}")
+        logger.info("FTS index rebuilt")
+    
+    def vacuum_analyze(self):
+        """
+        Periodic maintenance: full ANALYZE, reclaim free pages and
+        truncate the WAL file.
+        """
+        conn = self._get_connection()
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.commit()
         
-        return indexed_docs
+        logger.info("Index database analyzed and vacuumed")
     
     def _store_document(self, document: Document) -> int:
-        """Store document in database"""
-        import json
-        
+        """Store document in database (caller commits)"""
         conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO documents (
-                file_path, file_name, file_type, title, content,
-                metadata, user_id, tags, indexed_at, file_size_bytes, num_chunks
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor = conn.execute(_INSERT_DOC_SQL, (
             document.file_path,
             document.file_name,
             document.file_type.value,
             document.title,
-            document.content,
-            json.dumps(document.metadata),
+            document.content if self.keep_full_content else '',
+            _dumps(document.metadata).decode(),
             document.user_id,
-            json.dumps(document.tags),
+            _dumps(document.tags).decode(),
             document.indexed_at,
             document.file_size_bytes,
             document.num_chunks
         ))
         
-        conn.commit()
+        self._stats_cache = None
+        
         return cursor.lastrowid
     
     def _store_chunk(self, chunk: DocumentChunk) -> int:
-        """Store document chunk"""
-        import json
+        """Store document chunk (caller commits)"""
+        content_hash = _content_hash(chunk.content)
         
         conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO document_chunks (
-                document_id, content, chunk_index, start_char, end_char,
-                metadata, embedding_id, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        conn.execute(_INSERT_CHUNK_CONTENT_SQL, (content_hash, chunk.content))
+        cursor = conn.execute(_INSERT_CHUNK_SQL, (
             chunk.document_id,
-            chunk.content,
+            content_hash,
             chunk.chunk_index,
             chunk.start_char,
             chunk.end_char,
-            json.dumps(chunk.metadata) if chunk.metadata else None,
+            _dumps(chunk.metadata).decode() if chunk.metadata else None,
             chunk.embedding_id,
             chunk.created_at
         ))
         
-        conn.commit()
         return cursor.lastrowid
     
-    def _get_document_by_path(self, file_path: str) -> Optional[Document]:
-        """Check if document already indexed"""
-        import json
+    def _store_chunks_bulk(self, chunks: List[DocumentChunk]):
+        """Store many document chunks with one executemany (caller commits)"""
+        hashes = [_content_hash(chunk.content) for chunk in chunks]
+        rows = [
+            (
+                chunk.document_id,
+                content_hash,
+                chunk.chunk_index,
+                chunk.start_char,
+                chunk.end_char,
+                _dumps(chunk.metadata).decode() if chunk.metadata else None,
+                chunk.embedding_id,
+                chunk.created_at
+            )
+            for chunk, content_hash in zip(chunks, hashes)
+        ]
         
         conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM documents 
-            WHERE file_path = ? AND deleted_at IS NULL
-        """, (file_path,))
+        conn.executemany(
+            _INSERT_CHUNK_CONTENT_SQL,
+            ((content_hash, chunk.content) for chunk, content_hash in zip(chunks, hashes))
+        )
+        conn.executemany(_INSERT_CHUNK_SQL, rows)
+    
+    def _get_document_by_path(
+        self,
+        file_path: str,
+        include_content: bool = True
+    ) -> Optional[Document]:
+        """
+        Get indexed document by path.
         
-        row = cursor.fetchone()
+        With include_content=False the (possibly large) text column is not
+        read and the returned Document has empty content. Documents stored
+        without their full text get content rebuilt from their chunks
+        (joined by blank lines; overlapping text repeats).
+        """
+        conn = self._get_connection()
+        sql = _SELECT_DOC_BY_PATH_SQL if include_content else _SELECT_DOC_META_BY_PATH_SQL
+        row = conn.execute(sql, (file_path,)).fetchone()
         if not row:
             return None
         
+        document = self._row_to_document(row)
+        if include_content and not document.content and document.num_chunks:
+            document.content = "\n\n".join(
+                r['content'] for r in conn.execute(_SELECT_CHUNK_TEXTS_SQL, (document.id,))
+            )
+        
+        return document
+    
+    def _get_documents_under(self, directory: str) -> Dict[str, Document]:
+        """
+        Get live documents below a directory in one query, keyed by path.
+        
+        Content is not loaded. Uses a range scan on file_path rather
+        than LIKE so the path index applies.
+        """
+        prefix = os.path.join(os.path.abspath(directory), "")
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        
+        conn = self._get_connection()
+        rows = conn.execute(_SELECT_DOC_META_IN_RANGE_SQL, (prefix, upper))
+        
+        return {row['file_path']: self._row_to_document(row) for row in rows}
+    
+    def _row_to_document(self, row: sqlite3.Row) -> Document:
+        """Build Document from a documents row"""
         doc = Document(
             id=row['id'],
             file_path=row['file_path'],
             file_name=row['file_name'],
-            file_type=row['file_type'],
+            file_type=DocumentType(row['file_type']),
             title=row['title'],
             content=row['content'],
-            metadata=json.loads(row['metadata']) if row['metadata'] else {},
+            metadata=_loads(row['metadata']) if row['metadata'] else {},
             user_id=row['user_id'],
-            tags=json.loads(row['tags']) if row['tags'] else [],
+            tags=_loads(row['tags']) if row['tags'] else [],
             indexed_at=datetime.fromisoformat(row['indexed_at']) if row['indexed_at'] else None,
             file_size_bytes=row['file_size_bytes'],
             num_chunks=row['num_chunks']
@@ -351,56 +819,35 @@ class DocumentIndexer:
         return doc
     
     def get_stats(self) -> IndexStats:
-        """Get indexing statistics"""
-        import json
+        """Get indexing statistics (cached briefly between writes)"""
+        now = time.monotonic()
+        if self._stats_cache and now - self._stats_cache[0] < STATS_TTL_SECONDS:
+            return self._stats_cache[1]
         
         conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Total documents
-        cursor.execute("SELECT COUNT(*) as count FROM documents WHERE deleted_at IS NULL")
-        total_docs = cursor.fetchone()['count']
-        
-        # Total chunks
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM document_chunks c
-            JOIN documents d ON c.document_id = d.id
-            WHERE d.deleted_at IS NULL
-        """)
-        total_chunks = cursor.fetchone()['count']
         
-        # Total size
-        cursor.execute("""
-            SELECT SUM(file_size_bytes) as total FROM documents 
-            WHERE deleted_at IS NULL
-        """)
-        total_size = cursor.fetchone()['total'] or 0
+        # Totals, size and last indexed in one pass over documents
+        docs = conn.execute(_STATS_DOCS_SQL).fetchone()
+        total_chunks = conn.execute(_STATS_CHUNKS_SQL).fetchone()['count']
+        by_type = {row['file_type']: row['count'] for row in conn.execute(_STATS_BY_TYPE_SQL)}
         
-        # By type
-        cursor.execute("""
-            SELECT file_type, COUNT(*) as count FROM documents 
-            WHERE deleted_at IS NULL
-            GROUP BY file_type
-        """)
-        by_type = {row['file_type']: row['count'] for row in cursor.fetchall()}
+        last_indexed = docs['last']
         
-        # Last indexed
-        cursor.execute("""
-            SELECT MAX(indexed_at) as last FROM documents 
-            WHERE deleted_at IS NULL
-        """)
-        last_indexed = cursor.fetchone()['last']
-        
-        return IndexStats(
-            total_documents=total_docs,
+        stats = IndexStats(
+            total_documents=docs['count'],
             total_chunks=total_chunks,
-            total_size_bytes=total_size,
+            total_size_bytes=docs['total'] or 0,
             documents_by_type=by_type,
             last_indexed=datetime.fromisoformat(last_indexed) if last_indexed else None
         )
+        self._stats_cache = (now, stats)
+        
+        return stats
     
     def close(self):
         """Close database connection"""
+        self._stats_cache = None
+        
         if self.conn:
             self.conn.close()
             self.conn = None
@@ -5,123 +5,243 @@ Loaders for PDF, DOCX, TXT, Markdown, HTML, etc.
 """
 
 import os
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Iterator, Tuple
 from modules.rag.base import DocumentLoader, Document, DocumentType
 from utils.logger import get_logger
 
 logger = get_logger('rag.loaders')
 
+# Read size for streaming text files
+READ_BLOCK_SIZE = 1 << 20  # 1MB
+
+# Whitespace runs that break HTML text into lines: anything containing a
+# newline or 2+ spaces/tabs (surrounding whitespace is absorbed)
+_HTML_BREAK_RE = re.compile(r'\s*(?:\n|[ \t]{2,})\s*')
+
+# Trailing whitespace run, held back between streamed HTML parts so a
+# run is never split (and so normalizes the same as the whole text)
+_TRAILING_SPACE_RE = re.compile(r'\s+\Z')
+
+
+def _path_info(file_path: str) -> Tuple[Path, str, int]:
+    """Path object, absolute path and size in bytes (one stat call)"""
+    path = Path(file_path)
+    return path, os.path.abspath(file_path), os.stat(file_path).st_size
+
+
+def _extension(file_path: str) -> str:
+    """Lowercased file extension, including the dot"""
+    return os.path.splitext(file_path)[1].lower()
+
 # ===== TEXT LOADER =====
 
 class TextLoader(DocumentLoader):
     """Load plain text and markdown files"""
     
+    @classmethod
+    def supported_extensions(cls) -> Tuple[str, ...]:
+        return ('.txt', '.md', '.markdown')
+    
     def can_load(self, file_path: str) -> bool:
         """Check if file is text or markdown"""
-        ext = Path(file_path).suffix.lower()
-        return ext in ['.txt', '.md', '.markdown']
+        return _extension(file_path) in self.supported_extensions()
     
     def load(self, file_path: str) -> Document:
         """Load text file"""
-        path = Path(file_path)
+        doc, parts = self.stream(file_path)
+        doc.content = "".join(parts)
         
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        logger.info(f"Loaded text: {doc.file_name} ({len(doc.content)} chars)")
+        return doc
+    
+    def stream(self, file_path: str) -> Tuple[Document, Iterator[str]]:
+        """Stream text file in fixed-size blocks"""
+        path, abs_path, size = _path_info(file_path)
         
         # Determine type
         ext = path.suffix.lower()
         doc_type = DocumentType.MARKDOWN if ext in ['.md', '.markdown'] else DocumentType.TXT
         
         doc = Document(
-            file_path=str(path.absolute()),
+            file_path=abs_path,
             file_name=path.name,
             file_type=doc_type,
             title=path.stem,
-            content=content,
-            file_size_bytes=path.stat().st_size,
+            file_size_bytes=size,
             metadata={'extension': ext}
         )
         
-        logger.info(f"Loaded text: {path.name} ({len(content)} chars)")
-        return doc
+        def read_blocks() -> Iterator[str]:
+            with open(path, 'r', encoding='utf-8') as f:
+                while True:
+                    block = f.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    yield block
+        
+        return doc, read_blocks()
 
 
 # ===== PDF LOADER =====
 
 class PDFLoader(DocumentLoader):
-    """Load PDF files"""
+    """
+    Load PDF files.
+    
+    Uses pypdfium2 (PDFium, native code) when installed, falling back
+    to pure-Python PyPDF2.
+    """
     
     def __init__(self):
+        self.backend: Optional[str] = None
         self.available = self._check_dependencies()
     
+    @classmethod
+    def supported_extensions(cls) -> Tuple[str, ...]:
+        return ('.pdf',)
+    
     def _check_dependencies(self) -> bool:
         """Check if PDF libraries are available"""
+        try:
+            import pypdfium2
+            self.backend = 'pdfium'
+            return True
+        except ImportError:
+            pass
+        
         try:
             import PyPDF2
+            self.backend = 'pypdf2'
             return True
         except ImportError:
-            logger.warning("PyPDF2 not installed. Install with: pip install PyPDF2")
+            logger.warning("No PDF library installed. Install with: pip install pypdfium2 (or PyPDF2)")
             return False
     
     def can_load(self, file_path: str) -> bool:
         """Check if file is PDF"""
-        return Path(file_path).suffix.lower() == '.pdf' and self.available
+        return _extension(file_path) in self.supported_extensions() and self.available
     
     def load(self, file_path: str) -> Document:
         """Load PDF file"""
-        if not self.available:
-            raise ImportError("PyPDF2 not installed. Install with: pip install PyPDF2")
+        doc, parts = self.stream(file_path)
+        doc.content = "".join(parts)
         
-        import PyPDF2
+        logger.info(f"Loaded PDF: {doc.file_name} ({len(doc.content)} chars, {doc.metadata.get('num_pages', 0)} pages)")
+        return doc
+    
+    def stream(self, file_path: str) -> Tuple[Document, Iterator[str]]:
+        """Stream PDF text page by page"""
+        if not self.available:
+            raise ImportError("No PDF library installed. Install with: pip install pypdfium2 (or PyPDF2)")
         
-        path = Path(file_path)
-        text_content = []
+        path, abs_path, size = _path_info(file_path)
         
         try:
-            with open(path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                
-                # Extract text from all pages
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        text = page.extract_text()
-                        if text.strip():
-                            text_content.append(text)
-                    except Exception as e:
-                        logger.warning(f"Failed to extract page {page_num}: {e}")
-                
-                # Get metadata
-                metadata = {
-                    'num_pages': len(pdf_reader.pages),
-                    'extension': '.pdf'
-                }
-                
-                # Try to get PDF metadata
-                if pdf_reader.metadata:
-                    if '/Title' in pdf_reader.metadata:
-                        metadata['pdf_title'] = pdf_reader.metadata['/Title']
-                    if '/Author' in pdf_reader.metadata:
-                        metadata['pdf_author'] = pdf_reader.metadata['/Author']
-        
+            if self.backend == 'pdfium':
+                metadata, pages = self._open_pdfium(path)
+            else:
+                metadata, pages = self._open_pypdf2(path)
         except Exception as e:
             logger.error(f"Failed to load PDF {path}: {e}")
             raise
         
-        content = "\n\n".join(text_content)
-        
         doc = Document(
-            file_path=str(path.absolute()),
+            file_path=abs_path,
             file_name=path.name,
             file_type=DocumentType.PDF,
             title=metadata.get('pdf_title', path.stem),
-            content=content,
-            file_size_bytes=path.stat().st_size,
+            file_size_bytes=size,
             metadata=metadata
         )
         
-        logger.info(f"Loaded PDF: {path.name} ({len(content)} chars, {metadata.get('num_pages', 0)} pages)")
-        return doc
+        def read_pages() -> Iterator[str]:
+            first = True
+            for text in pages:
+                if text.strip():
+                    # Pages are separated by a blank line
+                    yield text if first else "\n\n" + text
+                    first = False
+        
+        return doc, read_pages()
+    
+    def _open_pdfium(self, path: Path) -> Tuple[dict, Iterator[str]]:
+        """Open with pypdfium2; returns metadata and page text iterator"""
+        import pypdfium2 as pdfium
+        
+        pdf = pdfium.PdfDocument(str(path))
+        
+        try:
+            metadata = {
+                'num_pages': len(pdf),
+                'extension': '.pdf'
+            }
+            
+            info = pdf.get_metadata_dict()
+            if info.get('Title'):
+                metadata['pdf_title'] = info['Title']
+            if info.get('Author'):
+                metadata['pdf_author'] = info['Author']
+        except Exception:
+            pdf.close()
+            raise
+        
+        # PDFium is not thread-safe, so pages are extracted in order
+        def page_texts() -> Iterator[str]:
+            try:
+                for page_num in range(len(pdf)):
+                    try:
+                        page = pdf[page_num]
+                        textpage = page.get_textpage()
+                        text = textpage.get_text_range()
+                        textpage.close()
+                        page.close()
+                    except Exception as e:
+                        logger.warning(f"Failed to extract page {page_num}: {e}")
+                        continue
+                    yield text
+            finally:
+                pdf.close()
+        
+        return metadata, page_texts()
+    
+    def _open_pypdf2(self, path: Path) -> Tuple[dict, Iterator[str]]:
+        """Open with PyPDF2; returns metadata and page text iterator"""
+        import PyPDF2
+        
+        f = open(path, 'rb')
+        
+        try:
+            pdf_reader = PyPDF2.PdfReader(f)
+            
+            # Get metadata
+            metadata = {
+                'num_pages': len(pdf_reader.pages),
+                'extension': '.pdf'
+            }
+            
+            # Try to get PDF metadata
+            if pdf_reader.metadata:
+                if '/Title' in pdf_reader.metadata:
+                    metadata['pdf_title'] = pdf_reader.metadata['/Title']
+                if '/Author' in pdf_reader.metadata:
+                    metadata['pdf_author'] = pdf_reader.metadata['/Author']
+        except Exception:
+            f.close()
+            raise
+        
+        def page_texts() -> Iterator[str]:
+            with f:
+                for page_num, page in enumerate(pdf_reader.pages):
+                    try:
+                        text = page.extract_text()
+                    except Exception as e:
+                        logger.warning(f"Failed to extract page {page_num}: {e}")
+                        continue
+                    yield text
+        
+        return metadata, page_texts()
 
 
 # ===== DOCX LOADER =====
@@ -132,6 +252,10 @@ class DOCXLoader(DocumentLoader):
     def __init__(self):
         self.available = self._check_dependencies()
     
+    @classmethod
+    def supported_extensions(cls) -> Tuple[str, ...]:
+        return ('.docx',)
+    
     def _check_dependencies(self) -> bool:
         """Check if python-docx is available"""
         try:
@@ -143,7 +267,7 @@ class DOCXLoader(DocumentLoader):
     
     def can_load(self, file_path: str) -> bool:
         """Check if file is DOCX"""
-        return Path(file_path).suffix.lower() == '.docx' and self.available
+        return _extension(file_path) in self.supported_extensions() and self.available
     
     def load(self, file_path: str) -> Document:
         """Load DOCX file"""
@@ -152,7 +276,7 @@ class DOCXLoader(DocumentLoader):
         
         import docx
         
-        path = Path(file_path)
+        path, abs_path, size = _path_info(file_path)
         
         try:
             doc_obj = docx.Document(path)
@@ -181,12 +305,12 @@ class DOCXLoader(DocumentLoader):
             raise
         
         doc = Document(
-            file_path=str(path.absolute()),
+            file_path=abs_path,
             file_name=path.name,
             file_type=DocumentType.DOCX,
             title=metadata.get('docx_title', path.stem),
             content=content,
-            file_size_bytes=path.stat().st_size,
+            file_size_bytes=size,
             metadata=metadata
         )
         
@@ -196,52 +320,104 @@ class DOCXLoader(DocumentLoader):
 
 # ===== HTML LOADER =====
 
+class _HTMLTextTarget:
+    """lxml parser target collecting visible text and the <title>"""
+    
+    SKIP_TAGS = frozenset(('script', 'style'))
+    
+    def __init__(self):
+        self.parts = []
+        self.title: Optional[str] = None
+        self.in_body = False
+        self._title_parts: Optional[list] = None
+        self._skip_depth = 0
+    
+    def start(self, tag, attrib):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title' and self.title is None:
+            self._title_parts = []
+        elif tag == 'body':
+            self.in_body = True
+    
+    def end(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == 'title' and self._title_parts is not None:
+            self.title = "".join(self._title_parts)
+            self._title_parts = None
+    
+    def data(self, text):
+        if self._skip_depth:
+            return
+        self.parts.append(text)
+        if self._title_parts is not None:
+            self._title_parts.append(text)
+    
+    def close(self):
+        return None
+
+
 class HTMLLoader(DocumentLoader):
     """Load HTML files"""
     
     def __init__(self):
+        self.parser = 'html.parser'
         self.available = self._check_dependencies()
     
+    @classmethod
+    def supported_extensions(cls) -> Tuple[str, ...]:
+        return ('.html', '.htm')
+    
     def _check_dependencies(self) -> bool:
-        """Check if BeautifulSoup is available"""
+        """Check if BeautifulSoup (and optionally lxml) is available"""
         try:
             from bs4 import BeautifulSoup
-            return True
         except ImportError:
             logger.warning("beautifulsoup4 not installed. Install with: pip install beautifulsoup4")
             return False
+        
+        # lxml is a much faster parser than the pure-Python default
+        try:
+            import lxml
+            self.parser = 'lxml'
+        except ImportError:
+            pass
+        
+        return True
     
     def can_load(self, file_path: str) -> bool:
         """Check if file is HTML"""
-        ext = Path(file_path).suffix.lower()
-        return ext in ['.html', '.htm'] and self.available
+        return _extension(file_path) in self.supported_extensions() and self.available
     
     def load(self, file_path: str) -> Document:
         """Load HTML file"""
         if not self.available:
             raise ImportError("beautifulsoup4 not installed. Install with: pip install beautifulsoup4")
         
+        if self.parser == 'lxml':
+            doc, parts = self.stream(file_path)
+            doc.content = "".join(parts)
+            
+            logger.info(f"Loaded HTML: {doc.file_name} ({len(doc.content)} chars)")
+            return doc
+        
         from bs4 import BeautifulSoup
         
-        path = Path(file_path)
+        path, abs_path, size = _path_info(file_path)
         
         with open(path, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
         # Parse HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, self.parser)
         
         # Remove script and style elements
         for script in soup(['script', 'style']):
             script.decompose()
         
-        # Get text
-        text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        content = '\n'.join(chunk for chunk in chunks if chunk)
+        # Get text, one phrase per line
+        content = _HTML_BREAK_RE.sub('\n', soup.get_text()).strip()
         
         # Get title
         title = path.stem
@@ -250,17 +426,100 @@ class HTMLLoader(DocumentLoader):
             title = title_tag.string
         
         doc = Document(
-            file_path=str(path.absolute()),
+            file_path=abs_path,
             file_name=path.name,
             file_type=DocumentType.HTML,
             title=title,
             content=content,
-            file_size_bytes=path.stat().st_size,
+            file_size_bytes=size,
             metadata={'extension': path.suffix}
         )
         
         logger.info(f"Loaded HTML: {path.name} ({len(content)} chars)")
         return doc
+    
+    def stream(self, file_path: str) -> Tuple[Document, Iterator[str]]:
+        """
+        Stream HTML text with lxml's push parser.
+        
+        No tree is built: a parser target receives text as each block
+        is fed, so memory stays bounded by the block size. Without lxml
+        this falls back to a full BeautifulSoup load.
+        """
+        if not self.available or self.parser != 'lxml':
+            return super().stream(file_path)
+        
+        from lxml import etree
+        
+        path, abs_path, size = _path_info(file_path)
+        
+        target = _HTMLTextTarget()
+        parser = etree.HTMLParser(target=target, encoding='utf-8')
+        f = open(path, 'rb')
+        
+        def feed_block() -> bool:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                try:
+                    parser.close()
+                except etree.XMLSyntaxError:
+                    pass  # empty document
+                return False
+            parser.feed(block)
+            return True
+        
+        # Parse far enough to know the title before returning
+        try:
+            more = True
+            while more and target.title is None and not target.in_body:
+                more = feed_block()
+        except Exception as e:
+            f.close()
+            logger.error(f"Failed to load HTML {path}: {e}")
+            raise
+        
+        doc = Document(
+            file_path=abs_path,
+            file_name=path.name,
+            file_type=DocumentType.HTML,
+            title=target.title or path.stem,
+            file_size_bytes=size,
+            metadata={'extension': path.suffix}
+        )
+        
+        def read_text() -> Iterator[str]:
+            nonlocal more
+            carry = ""
+            first = True
+            try:
+                while True:
+                    text = carry + "".join(target.parts)
+                    target.parts.clear()
+                    
+                    carry = ""
+                    if more:
+                        match = _TRAILING_SPACE_RE.search(text)
+                        if match:
+                            text, carry = text[:match.start()], text[match.start():]
+                    
+                    # One phrase per line, as with BeautifulSoup
+                    text = _HTML_BREAK_RE.sub('\n', text)
+                    if first:
+                        text = text.lstrip()
+                    if not more:
+                        text = text.rstrip()
+                    
+                    if text:
+                        first = False
+                        yield text
+                    
+                    if not more:
+                        break
+                    more = feed_block()
+            finally:
+                f.close()
+        
+        return doc, read_text()
 
 
 # ===== LOADER REGISTRY =====
@@ -276,32 +535,55 @@ class LoaderRegistry:
             HTMLLoader()
         ]
         
+        # Extension -> loader, for usable loaders only (first one wins)
+        self._by_ext = {}
+        for loader in self.loaders:
+            if not getattr(loader, 'available', True):
+                continue
+            for ext in loader.supported_extensions():
+                self._by_ext.setdefault(ext, loader)
+        
         logger.info(f"LoaderRegistry initialized with {len(self.loaders)} loaders")
     
-    def get_loader(self, file_path: str) -> Optional[DocumentLoader]:
-        """Get appropriate loader for file"""
-        for loader in self.loaders:
-            if loader.can_load(file_path):
-                return loader
+    def get_loader(self, file_path: str, ext: Optional[str] = None) -> Optional[DocumentLoader]:
+        """
+        Get appropriate loader for file.
         
-        return None
+        Args:
+            file_path: Path to file
+            ext: Lowercased extension, if the caller already has it
+        """
+        return self._by_ext.get(ext or _extension(file_path))
     
     def can_load(self, file_path: str) -> bool:
         """Check if any loader can handle this file"""
         return self.get_loader(file_path) is not None
     
-    def load_document(self, file_path: str) -> Document:
+    def load_document(self, file_path: str, ext: Optional[str] = None) -> Document:
         """Load a document using appropriate loader"""
-        loader = self.get_loader(file_path)
+        loader = self.get_loader(file_path, ext)
         
         if not loader:
             raise ValueError(f"No loader available for: {file_path}")
         
         return loader.load(file_path)
     
+    def stream_document(
+        self,
+        file_path: str,
+        ext: Optional[str] = None
+    ) -> Tuple[Document, Iterator[str]]:
+        """Stream a document's text using appropriate loader"""
+        loader = self.get_loader(file_path, ext)
+        
+        if not loader:
+            raise ValueError(f"No loader available for: {file_path}")
+        
+        return loader.stream(file_path)
+    
     def get_supported_extensions(self) -> list:
         """Get list of supported file extensions"""
-        return ['.txt', '.md', '.pdf', '.docx', '.html', '.htm']
+        return list(self._by_ext)
 
 
 # Global instance
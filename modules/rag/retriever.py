@@ -4,17 +4,127 @@ RAG Retriever - Search and Retrieve Document Chunks
 Combines SQL FTS and vector search for optimal retrieval.
 """
 
+import asyncio
+import concurrent.futures
+import queue
+import re
 import sqlite3
 import json
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 from modules.rag.base import RAGRetriever, RAGResult
 from modules.memory.vector_store import ChromaVectorStore, CHROMADB_AVAILABLE
 from utils.logger import get_logger
 
 logger = get_logger('rag.retriever')
 
+# Read connections kept per retriever
+READ_POOL_SIZE = 4
+
+# Recent retrieve() results kept for repeated queries (dropped as soon
+# as the index changes, see _INDEX_STATE_SQL)
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL_SECONDS = 300.0
+
+# Query embeddings kept for repeated vector searches
+EMBEDDING_CACHE_SIZE = 512
+
+# Vector searches arriving within this window share one Chroma query
+VECTOR_BATCH_WINDOW_SECONDS = 0.005
+
+# Minimum cosine similarity for vector hits
+VECTOR_MIN_SIMILARITY = 0.3
+
+# Statement cache per connection (sqlite3 default is 128)
+CACHED_STATEMENTS = 256
+
+# Changes whenever chunks become searchable or documents are removed
+_INDEX_STATE_SQL = """
+    SELECT
+        (SELECT value FROM index_meta WHERE key = 'fts_high_water'),
+        (SELECT COUNT(*) FROM documents WHERE deleted_at IS NULL)
+"""
+
+# Characters that could cause FTS syntax errors
+_FTS_STRIP_RE = re.compile(r'[!?.,;:\'"`(){}[\]<>|/\\&^%$#@]')
+
+# Bound parameters per IN (...) query (SQLite's historical default limit)
+SQLITE_MAX_VARIABLES = 999
+
+# Reciprocal Rank Fusion constant (score = sum of 1 / (RRF_K + rank))
+RRF_K = 60
+
+# Candidate count above which RRF scores are summed/sorted with NumPy
+NUMPY_FUSION_THRESHOLD = 64
+
+# FTS matches ranked before joining/filtering (see _FTS_SQL)
+BM25_INNER_LIMIT = 2000
+
+# |bm25| of the best FTS hit above which vector search is skipped (about
+# two rare query terms matching; scores grow with matched terms and rarity)
+FTS_STRONG_SCORE = 5.0
+
+# BM25 column weights for documents_fts (title, content)
+BM25_WEIGHT_TITLE = 3.0
+BM25_WEIGHT_CONTENT = 1.0
+
+# FTS5 rank function override applied per query
+_BM25_RANK = f"bm25({BM25_WEIGHT_TITLE}, {BM25_WEIGHT_CONTENT})"
+
+# Search chunks via FTS. The inner query has only the MATCH, so FTS5 can
+# rank with early termination; joins and the deleted_at filter apply to
+# its top matches only.
+_FTS_SQL = """
+    SELECT 
+        c.id as chunk_id,
+        COALESCE(cc.content, c.content) as content,
+        c.chunk_index,
+        c.document_id,
+        d.file_name,
+        d.file_path,
+        d.title,
+        fts.base_rank as score
+    FROM (
+        SELECT rowid, rank AS base_rank FROM documents_fts
+        WHERE documents_fts MATCH ? AND rank MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    ) fts
+    JOIN document_chunks c ON c.id = fts.rowid
+    LEFT JOIN chunk_contents cc ON cc.hash = c.content_hash
+    JOIN documents d ON c.document_id = d.id
+    WHERE d.deleted_at IS NULL
+    ORDER BY fts.base_rank
+    LIMIT ?
+"""
+
+# Chunk details for a batch of ids ({placeholders} is "?,?,...")
+_CHUNKS_INFO_SQL = """
+    SELECT 
+        c.id,
+        COALESCE(cc.content, c.content) as content,
+        c.chunk_index,
+        c.document_id,
+        d.file_name,
+        d.file_path,
+        d.title
+    FROM document_chunks c
+    LEFT JOIN chunk_contents cc ON cc.hash = c.content_hash
+    JOIN documents d ON c.document_id = d.id
+    WHERE c.id IN ({placeholders})
+"""
+
 class HybridRetriever(RAGRetriever):
     """
     Hybrid retrieval combining:
@@ -29,33 +139,109 @@ class HybridRetriever(RAGRetriever):
         vector_path: str = "data/rag_chromadb"
     ):
         self.db_path = Path(db_path)
-        self.conn: Optional[sqlite3.Connection] = None
         
-        # Vector store for semantic search
+        # Read-only connections, shared by concurrent retrieve() calls
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._pool_lock = threading.Lock()
+        self._pool_opened = 0
+        
+        # (query, top_k, filters) -> (time stored, index state, results),
+        # least recent first
+        self._result_cache: "OrderedDict[tuple, Tuple[float, tuple, List[RAGResult]]]" = OrderedDict()
+        
+        # query -> embedding; searches run in worker threads, hence the lock
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embedding_lock = threading.Lock()
+        
+        # Vector store for semantic search, opened on first vector search
         self.vector_store: Optional[ChromaVectorStore] = None
+        self._vector_ready = False
+        self._vector_lock = threading.Lock()
+        
+        # (embedding, limit, future) waiting for the next batched query
+        self._vector_batch: List[Tuple[List[float], int, concurrent.futures.Future]] = []
+        self._vector_batch_lock = threading.Lock()
+        
         if CHROMADB_AVAILABLE:
             self.vector_store = ChromaVectorStore(vector_path)
+        
+        logger.info(f"HybridRetriever initialized (vector={'available' if self.vector_store else 'disabled'})")
+    
+    def _ensure_vector_store(self) -> bool:
+        """Open the RAG collection once; disables vector search on failure"""
+        if self._vector_ready:
+            return True
+        
+        with self._vector_lock:
+            if self._vector_ready:
+                return True
+            if not self.vector_store:
+                return False
+            
             try:
-                self.vector_store.initialize()
-                # Use different collection for RAG
-                self.vector_store.collection_name = "rag_documents"
-                self.vector_store.collection = self.vector_store.client.get_or_create_collection(
-                    name="rag_documents",
-                    metadata={"description": "RAG document chunks"}
+                self.vector_store.initialize(
+                    collection_name="rag_documents",
+                    description="RAG document chunks"
                 )
+                self._vector_ready = True
                 logger.info("Vector store ready for RAG")
             except Exception as e:
                 logger.warning(f"Vector store initialization failed: {e}")
                 self.vector_store = None
         
-        logger.info(f"HybridRetriever initialized (vector={'enabled' if self.vector_store else 'disabled'})")
+        return self._vector_ready
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """
+        Open a read-only database connection.
+        
+        Tuned for repeated reads: 64MB page cache, in-memory temp storage
+        for FTS sorts and 256MB mmap. The indexer owns all writes (and
+        puts the database in WAL mode, so these reads don't block it).
+        """
+        conn = sqlite3.connect(
+            self.db_path.resolve().as_uri() + "?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS
+        )
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA mmap_size=268435456;
+        """)
+        return conn
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
-        if self.conn is None:
-            self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
-        return self.conn
+    @contextmanager
+    def _borrow(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read connection from the pool.
+        
+        Connections are opened on demand up to READ_POOL_SIZE; after that
+        callers wait for one to be returned.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._pool_opened < READ_POOL_SIZE
+                if can_open:
+                    self._pool_opened += 1
+            if can_open:
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    with self._pool_lock:
+                        self._pool_opened -= 1
+                    raise
+            else:
+                conn = self._pool.get()
+        
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
     
     async def retrieve(
         self,
@@ -74,37 +260,81 @@ class HybridRetriever(RAGRetriever):
         Returns:
             List of RAGResult objects
         """
-        all_results = []
-        
-        # 1. FTS keyword search
-        fts_results = self._fts_search(query, limit=top_k * 2)
-        all_results.extend(fts_results)
+        # Repeated queries are answered from the cache for a few minutes,
+        # as long as the index hasn't changed since (the state is read in
+        # a worker thread, since _borrow() may wait for a pooled connection)
+        cache_key = (
+            query,
+            top_k,
+            tuple(sorted((k, repr(v)) for k, v in filters.items())) if filters else None
+        )
+        index_state = await asyncio.to_thread(self._index_state)
+        cached = self._result_cache.get(cache_key)
+        if (
+            cached
+            and cached[1] == index_state
+            and time.monotonic() - cached[0] < RESULT_CACHE_TTL_SECONDS
+        ):
+            self._result_cache.move_to_end(cache_key)
+            logger.debug(f"Retrieved {len(cached[2])} cached results for: {query}")
+            return list(cached[2])
         
-        # 2. Vector semantic search (if available)
+        # 1. FTS keyword search and 2. vector semantic search (if
+        # available), run concurrently off the event loop
+        fts_task = asyncio.ensure_future(asyncio.to_thread(self._fts_search, query, top_k * 2))
+        vector_task = None
+        skip_vector = threading.Event()
         if self.vector_store:
-            vector_results = self._vector_search(query, limit=top_k)
-            all_results.extend(vector_results)
+            vector_task = asyncio.ensure_future(
+                asyncio.to_thread(self._vector_search, query, top_k, skip_vector)
+            )
+        
+        fts_results = await fts_task
+        ranked_lists = [fts_results]
+        
+        if vector_task is not None:
+            # Strong keyword hits fill top_k on their own; don't wait on vectors
+            if len(fts_results) >= top_k and fts_results[0].relevance_score >= FTS_STRONG_SCORE:
+                # Cancelling doesn't stop the thread; skip_vector makes it
+                # bail out before embedding or borrowing a connection
+                skip_vector.set()
+                vector_task.cancel()
+                logger.debug(f"Strong FTS hits, skipping vector search for: {query}")
+            else:
+                ranked_lists.append(await vector_task)
+        
+        # 3. Deduplicate and fuse rankings
+        final_results = self._deduplicate_and_rank(ranked_lists, top_k)
         
-        # 3. Deduplicate and rank
-        final_results = self._deduplicate_and_rank(all_results, top_k)
+        if index_state is not None:
+            self._result_cache[cache_key] = (time.monotonic(), index_state, final_results)
+            self._result_cache.move_to_end(cache_key)
+            if len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
         
         logger.info(f"Retrieved {len(final_results)} results for: {query}")
         
-        return final_results
+        return list(final_results)
+    
+    def _index_state(self) -> Optional[tuple]:
+        """Current index state, or None if it can't be read (don't cache)"""
+        try:
+            with self._borrow() as conn:
+                return tuple(conn.execute(_INDEX_STATE_SQL).fetchone())
+        except Exception as e:
+            logger.debug(f"Index state unavailable: {e}")
+            return None
     
     def _clean_fts_query(self, query: str) -> str:
         """Clean query for FTS search"""
         if not query or not query.strip():
             return ""  # Return empty string to skip FTS search
             
-        import re
-        # Remove special characters that could cause FTS syntax errors
-        query = re.sub(r'[!?.,;:\'"`(){}[\]<>|/\\&^%$#@]', ' ', query)
-        # Normalize whitespace
-        query = ' '.join(query.split())
+        # Remove special characters that could cause FTS syntax errors;
+        # splitting also normalizes whitespace
+        terms = _FTS_STRIP_RE.sub(' ', query).split()
         
         # Add fuzzy matching for non-empty queries
-        terms = query.split()
         cleaned_terms = []
         for term in terms:
             if len(term) > 2:  # Only add fuzzy matching for longer terms
@@ -126,39 +356,23 @@ class HybridRetriever(RAGRetriever):
                 logger.debug("Empty query - skipping FTS search")
                 return []  # Skip FTS search for empty queries
                 
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
             # Search document chunks via FTS
-            cursor.execute("""
-                SELECT 
-                    c.id as chunk_id,
-                    c.content,
-                    c.chunk_index,
-                    c.document_id,
-                    d.file_name,
-                    d.file_path,
-                    d.title,
-                    bm25(documents_fts) as score
-                FROM document_chunks c
-                JOIN documents d ON c.document_id = d.id
-                JOIN documents_fts ON d.id = documents_fts.rowid
-                WHERE documents_fts MATCH ? AND d.deleted_at IS NULL
-                ORDER BY score DESC
-                LIMIT ?
-            """, (cleaned_query, limit))
-            
-            results = []
-            for row in cursor.fetchall():
-                results.append(RAGResult(
-                    content=row['content'],
-                    document_id=row['document_id'],
-                    document_name=row['file_name'],
-                    chunk_index=row['chunk_index'],
-                    relevance_score=abs(row['score']) if row['score'] else 0.0,
-                    source_path=row['file_path'],
-                    metadata={'source': 'fts', 'title': row['title']}
-                ))
+            with self._borrow() as conn:
+                results = [
+                    RAGResult(
+                        content=row['content'],
+                        document_id=row['document_id'],
+                        document_name=row['file_name'],
+                        chunk_index=row['chunk_index'],
+                        relevance_score=abs(row['score']) if row['score'] else 0.0,
+                        source_path=row['file_path'],
+                        metadata={'source': 'fts', 'title': row['title']}
+                    )
+                    for row in conn.execute(
+                        _FTS_SQL,
+                        (cleaned_query, _BM25_RANK, max(BM25_INNER_LIMIT, limit), limit)
+                    )
+                ]
             
             logger.debug(f"FTS found {len(results)} results")
             return results
@@ -167,25 +381,39 @@ class HybridRetriever(RAGRetriever):
             logger.error(f"FTS search error: {e}")
             return []
     
-    def _vector_search(self, query: str, limit: int = 5) -> List[RAGResult]:
-        """Search using vector similarity"""
-        if not self.vector_store:
+    def _vector_search(
+        self,
+        query: str,
+        limit: int = 5,
+        skip: Optional[threading.Event] = None
+    ) -> List[RAGResult]:
+        """
+        Search using vector similarity.
+        
+        Returns early (empty) once skip is set, i.e. the caller no longer
+        needs the results.
+        """
+        skip = skip or threading.Event()
+        if skip.is_set() or not self._ensure_vector_store():
             return []
         
         try:
-            # Search vector store
-            vector_results = self.vector_store.search(
-                query=query,
-                user_id="default_user",  # Can filter by user
-                limit=limit,
-                min_similarity=0.3
-            )
+            embedding = self._embed_query_cached(query)
+            if skip.is_set():
+                return []
+            
+            # Search vector store, batched with concurrent searches
+            vector_results = self._vector_query(embedding, limit)
+            if skip.is_set():
+                return []
+            
+            # Get chunk details from SQL in one query
+            chunks_info = self._get_chunks_info([vr.fact_id for vr in vector_results])
             
             # Convert to RAGResult
             results = []
             for vr in vector_results:
-                # Get chunk details from SQL
-                chunk_info = self._get_chunk_info(vr.fact_id)
+                chunk_info = chunks_info.get(vr.fact_id)
                 
                 if chunk_info:
                     results.append(RAGResult(
@@ -205,60 +433,132 @@ class HybridRetriever(RAGRetriever):
             logger.error(f"Vector search error: {e}")
             return []
     
-    def _get_chunk_info(self, chunk_id: int) -> Optional[Dict]:
-        """Get chunk information from SQL"""
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 
-                    c.content,
-                    c.chunk_index,
-                    c.document_id,
-                    d.file_name,
-                    d.file_path,
-                    d.title
-                FROM document_chunks c
-                JOIN documents d ON c.document_id = d.id
-                WHERE c.id = ?
-            """, (chunk_id,))
+    def _vector_query(self, embedding: List[float], limit: int) -> List:
+        """
+        Run a vector query, sharing one Chroma query with concurrent callers.
+        
+        The first caller in a window becomes the leader: it waits
+        VECTOR_BATCH_WINDOW_SECONDS, takes every pending embedding and
+        searches them together. The others wait on their future.
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._vector_batch_lock:
+            self._vector_batch.append((embedding, limit, future))
+            is_leader = len(self._vector_batch) == 1
+        
+        if is_leader:
+            time.sleep(VECTOR_BATCH_WINDOW_SECONDS)
+            with self._vector_batch_lock:
+                batch, self._vector_batch = self._vector_batch, []
             
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+            try:
+                batch_results = self.vector_store.search_batch(
+                    [pending[0] for pending in batch],
+                    user_id="default_user",  # Can filter by user
+                    limit=max(pending[1] for pending in batch),
+                    min_similarity=VECTOR_MIN_SIMILARITY
+                )
+                for (_, pending_limit, pending_future), results in zip(batch, batch_results):
+                    pending_future.set_result(results[:pending_limit])
+            except Exception as e:
+                for _, _, pending_future in batch:
+                    if not pending_future.done():
+                        pending_future.set_exception(e)
+        
+        return future.result()
+    
+    def _embed_query_cached(self, query: str) -> List[float]:
+        """Embed a query, reusing embeddings of recent queries"""
+        with self._embedding_lock:
+            embedding = self._embedding_cache.get(query)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(query)
+                return embedding
+        
+        embedding = self.vector_store.embed_query(query)
+        
+        with self._embedding_lock:
+            self._embedding_cache[query] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        
+        return embedding
+    
+    def _get_chunks_info(self, chunk_ids: List[int]) -> Dict[int, Dict]:
+        """Get information for many chunks from SQL, keyed by chunk id"""
+        info = {}
+        if not chunk_ids:
+            return info
+        
+        try:
+            with self._borrow() as conn:
+                for i in range(0, len(chunk_ids), SQLITE_MAX_VARIABLES):
+                    batch = chunk_ids[i:i + SQLITE_MAX_VARIABLES]
+                    sql = _CHUNKS_INFO_SQL.format(placeholders=",".join("?" * len(batch)))
+                    for row in conn.execute(sql, batch):
+                        info[row['id']] = dict(row)
             
         except Exception as e:
             logger.error(f"Failed to get chunk info: {e}")
-            return None
+        
+        return info
     
     def _deduplicate_and_rank(
         self,
-        results: List[RAGResult],
+        ranked_lists: List[List[RAGResult]],
         top_k: int
     ) -> List[RAGResult]:
-        """Deduplicate and rank results"""
+        """
+        Deduplicate and rank results with Reciprocal Rank Fusion.
         
-        # Deduplicate by content
-        seen_content = set()
-        unique_results = []
+        BM25 and cosine scores aren't comparable, so each chunk scores
+        sum(1 / (RRF_K + rank)) over the lists it appears in (best first).
+        The fused score replaces relevance_score. Chunks whose text starts
+        the same as a better-ranked one are dropped.
+        """
+        positions_by_key: Dict[tuple, int] = {}
+        candidates: List[RAGResult] = []
+        positions: List[int] = []
+        ranks: List[int] = []
+        
+        for results in ranked_lists:
+            for rank, result in enumerate(results, start=1):
+                key = (result.document_id, result.chunk_index)
+                position = positions_by_key.get(key)
+                if position is None:
+                    position = positions_by_key[key] = len(candidates)
+                    candidates.append(result)
+                positions.append(position)
+                ranks.append(rank)
+        
+        if NUMPY_AVAILABLE and len(positions) > NUMPY_FUSION_THRESHOLD:
+            fused_scores = np.zeros(len(candidates))
+            np.add.at(fused_scores, positions, 1.0 / (RRF_K + np.asarray(ranks, dtype=np.float64)))
+            # Stable, so ties keep first-seen order like sorted() below
+            order = np.argsort(-fused_scores, kind='stable').tolist()
+            scores = fused_scores.tolist()
+        else:
+            scores = [0.0] * len(candidates)
+            for position, rank in zip(positions, ranks):
+                scores[position] += 1.0 / (RRF_K + rank)
+            order = sorted(range(len(candidates)), key=scores.__getitem__, reverse=True)
         
-        for result in results:
-            content_key = result.content[:100].lower().strip()
+        # Identical text can sit in several documents; keep the best one
+        seen_content = set()
+        ranked_results = []
+        for position in order:
+            result = candidates[position]
+            content_key = hash(result.content[:100].strip().casefold())
+            if content_key in seen_content:
+                continue
+            seen_content.add(content_key)
             
-            if content_key not in seen_content:
-                seen_content.add(content_key)
-                unique_results.append(result)
-        
-        # Sort by relevance score
-        ranked_results = sorted(
-            unique_results,
-            key=lambda r: r.relevance_score,
-            reverse=True
-        )
+            result.relevance_score = scores[position]
+            ranked_results.append(result)
+            if len(ranked_results) == top_k:
+                break
         
-        return ranked_results[:top_k]
+        return ranked_results
     
     def format_context(
         self,
@@ -279,25 +579,36 @@ class HybridRetriever(RAGRetriever):
             return ""
         
         context_lines = ["Relevant information from documents:"]
-        total_length = len(context_lines[0])
+        budget = max_length - len(context_lines[0])
         
         for i, result in enumerate(results, 1):
-            # Format: "[Document: filename] content..."
-            line = f"\n[{i}. {result.document_name}] {result.content[:200]}..."
+            # Format: "\n[i. filename] content..." - measured before it is
+            # built, so entries that don't fit cost no formatting
+            head = result.content[:200]
+            needed = len(str(i)) + len(result.document_name) + len(head) + 9
             
-            if total_length + len(line) > max_length:
+            if needed > budget:
                 break
             
-            context_lines.append(line)
-            total_length += len(line)
+            context_lines.append(f"\n[{i}. {result.document_name}] {head}...")
+            budget -= needed
         
         return "".join(context_lines)
     
+    def clear_cache(self):
+        """Forget cached results (changes to the index are picked up without this)"""
+        self._result_cache.clear()
+    
     def close(self):
         """Close connections"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        self.clear_cache()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._pool_lock:
+            self._pool_opened = 0
 
 
 # Global instance
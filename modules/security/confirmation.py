@@ -5,12 +5,33 @@ Handles user confirmations for sensitive actions.
 """
 
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from utils.logger import get_logger
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = get_logger('security.confirmation')
 
+# Use the libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@lru_cache(maxsize=1)
+def _load_security_config() -> Optional[dict]:
+    """Parse config/security.yaml once per process (None if missing)"""
+    config_path = Path("config/security.yaml")
+    
+    if not config_path.exists():
+        return None
+    
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER) or {}
+
 class ConfirmationManager:
     """Manages confirmation flows for sensitive actions"""
     
@@ -19,19 +40,31 @@ class ConfirmationManager:
         self.enabled = self.config.get('confirmation', {}).get('enabled', True)
         self.timeout = self.config.get('confirmation', {}).get('timeout', 30)
         self.required_actions = self.config.get('confirmation', {}).get('require_for', [])
+        self._required_lower = frozenset(a.lower() for a in self.required_actions)
+        self._matcher = self._build_matcher()
         
         logger.info(f"Confirmation manager initialized (enabled={self.enabled})")
     
     def _load_config(self) -> dict:
         """Load security config"""
-        config_path = Path("config/security.yaml")
+        config = _load_security_config()
         
-        if not config_path.exists():
+        if config is None:
             logger.warning("security.yaml not found, using defaults")
             return self._default_config()
         
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f) or {}
+        return config
+    
+    def _build_matcher(self):
+        """Build an Aho-Corasick automaton over the required actions"""
+        if not AHOCORASICK_AVAILABLE or not self._required_lower:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for required in self._required_lower:
+            automaton.add_word(required, required)
+        automaton.make_automaton()
+        return automaton
     
     def _default_config(self) -> dict:
         """Default security config"""
@@ -57,12 +90,17 @@ class ConfirmationManager:
         if not self.enabled:
             return False
         
-        # Check if action in required list
-        for required in self.required_actions:
-            if required.lower() in action_name.lower():
-                return True
+        action_lower = action_name.lower()
+        
+        # Exact match first, then substring match against the required list
+        if action_lower in self._required_lower:
+            return True
+        
+        if self._matcher is not None:
+            # Single pass over the action name regardless of pattern count
+            return next(self._matcher.iter(action_lower), None) is not None
         
-        return False
+        return any(r in action_lower for r in self._required_lower)
     
     async def request_confirmation(
         self,
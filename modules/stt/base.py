@@ -4,8 +4,9 @@ Speech-to-Text Module - Base Interface
 Handles recording and transcribing user speech with configurable duration.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -24,6 +25,7 @@ class STTResult:
     confidence: float = 1.0
     language: Optional[str] = None
     duration: float = 0.0
+    is_final: bool = True             # False for interim (partial) transcripts
     
     def is_empty(self) -> bool:
         """Check if no text recognized"""
@@ -58,6 +60,19 @@ class STTProvider(ABC):
         """
         pass
     
+    async def stream_transcribe(self) -> AsyncIterator[STTResult]:
+        """
+        Listen and yield transcripts as they become available.
+        
+        Streaming providers yield interim results (is_final=False) while
+        the user is speaking, then one final result. The default runs
+        `listen` off the event loop and yields its final result only.
+        
+        Yields:
+            STTResult for each partial and the final transcript
+        """
+        yield await asyncio.to_thread(self.listen)
+    
     @abstractmethod
     def transcribe_audio(self, audio_data: bytes) -> STTResult:
         """
@@ -82,6 +97,15 @@ class STTProvider(ABC):
         """
         pass
     
+    def close(self):
+        """
+        Release any audio device held open between turns.
+        
+        Called before another component (e.g. the wake word detector)
+        opens the same input device.
+        """
+        pass
+    
     def set_energy_threshold(self, threshold: int):
         """Manually set voice detection threshold"""
         self.config.energy_threshold = threshold
@@ -2,10 +2,19 @@
 Google Speech-to-Text Implementation
 """
 
+import asyncio
 import speech_recognition as sr
 from modules.stt.base import STTProvider, STTConfig, STTResult
 from utils.logger import get_logger
+import threading
 import time
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+try:
+    from google.cloud import speech
+    GOOGLE_CLOUD_SPEECH_AVAILABLE = True
+except ImportError:
+    GOOGLE_CLOUD_SPEECH_AVAILABLE = False
 
 logger = get_logger('stt.google')
 
@@ -34,7 +43,226 @@ class GoogleSTT(STTProvider):
         if recording_config.get('dynamic_energy', True):
             self.recognizer.dynamic_energy_threshold = True
         
-        logger.info(f"Google STT initialized (timeout={self.config.timeout}s, max_duration={self.config.phrase_time_limit}s)")
+        # Microphone stream is opened once and reused until close()
+        # (the orchestrator closes it before each wake word phase)
+        self._mic: Optional[sr.Microphone] = None
+        self._mic_source = None
+        
+        # Cloud Speech streaming client (falls back to the web recognizer)
+        google_config = config.get('google', {})
+        self._model = google_config.get('model', 'default')
+        self._use_enhanced = google_config.get('use_enhanced', True)
+        self._client = None
+        
+        if google_config.get('streaming', True) and GOOGLE_CLOUD_SPEECH_AVAILABLE:
+            try:
+                self._client = speech.SpeechClient()
+            except Exception as e:
+                logger.warning(f"Cloud Speech unavailable, using web recognizer: {e}")
+        
+        logger.info(
+            f"Google STT initialized (timeout={self.config.timeout}s, max_duration={self.config.phrase_time_limit}s, "
+            f"streaming={self._client is not None})"
+        )
+    
+    def _get_source(self):
+        """Open the microphone stream on first use and keep it open"""
+        if self._mic_source is None:
+            mic = sr.Microphone()
+            self._mic_source = mic.__enter__()
+            self._mic = mic
+        return self._mic_source
+    
+    def close(self):
+        """Release the microphone stream"""
+        if self._mic is not None:
+            try:
+                self._mic.__exit__(None, None, None)
+            except Exception as e:
+                logger.debug(f"Microphone close failed: {e}")
+            finally:
+                self._mic = None
+                self._mic_source = None
+    
+    def _streaming_config(self, sample_rate: int):
+        """Build the Cloud Speech streaming config for the open microphone"""
+        recognition_config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
+            language_code=self.config.language,
+            model=self._model,
+            use_enhanced=self._use_enhanced
+        )
+        
+        return speech.StreamingRecognitionConfig(
+            config=recognition_config,
+            interim_results=True,
+            single_utterance=True
+        )
+    
+    def _audio_requests(
+        self,
+        source,
+        stop: threading.Event,
+        speech_started: threading.Event
+    ) -> Iterator:
+        """Yield microphone chunks to the streaming API until told to stop"""
+        start_time = time.time()
+        
+        while not stop.is_set():
+            elapsed = time.time() - start_time
+            
+            if elapsed > self.config.phrase_time_limit:
+                break
+            if not speech_started.is_set() and elapsed > self.config.timeout:
+                break
+            
+            chunk = source.stream.read(source.CHUNK)
+            yield speech.StreamingRecognizeRequest(audio_content=chunk)
+    
+    def _stream_recognize(
+        self,
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[str, bool, float]]:
+        """
+        Stream microphone audio to Cloud Speech while the user speaks.
+        
+        Args:
+            stop: Set by the caller to end the audio stream early
+        
+        Yields:
+            (transcript, is_final, confidence) as results arrive
+        """
+        source = self._get_source()
+        stop = stop or threading.Event()
+        speech_started = threading.Event()
+        
+        responses = self._client.streaming_recognize(
+            self._streaming_config(source.SAMPLE_RATE),
+            self._audio_requests(source, stop, speech_started)
+        )
+        end_of_utterance = speech.StreamingRecognizeResponse.SpeechEventType.END_OF_SINGLE_UTTERANCE
+        
+        try:
+            for response in responses:
+                if response.speech_event_type == end_of_utterance:
+                    stop.set()
+                
+                for result in response.results:
+                    if not result.alternatives:
+                        continue
+                    
+                    speech_started.set()
+                    alternative = result.alternatives[0]
+                    yield alternative.transcript, result.is_final, alternative.confidence
+                    
+                    if result.is_final:
+                        stop.set()
+        finally:
+            stop.set()
+    
+    def _listen_streaming(self, start_time: float) -> STTResult:
+        """Listen via Cloud Speech streaming recognition"""
+        logger.debug(f"Streaming (timeout={self.config.timeout}s, max={self.config.phrase_time_limit}s)...")
+        
+        text = ""
+        confidence = 0.0
+        
+        try:
+            for transcript, is_final, result_confidence in self._stream_recognize():
+                text = transcript
+                confidence = result_confidence
+                
+                if is_final:
+                    break
+                
+                logger.debug(f"Partial transcript: {transcript}")
+                
+        except OSError as e:
+            logger.error(f"Microphone error: {e}")
+            self.close()
+        
+        except Exception as e:
+            logger.error(f"Streaming recognition error: {e}")
+        
+        duration = time.time() - start_time
+        logger.debug(f"Streaming complete ({duration:.1f}s)")
+        
+        return STTResult(
+            text=text,
+            confidence=confidence,
+            language=self.config.language,
+            duration=duration
+        )
+    
+    async def stream_transcribe(self) -> AsyncIterator[STTResult]:
+        """Yield interim transcripts while the user speaks, then the final one"""
+        if self._client is None:
+            async for result in super().stream_transcribe():
+                yield result
+            return
+        
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+        
+        def produce():
+            self.is_recording = True
+            start_time = time.time()
+            
+            try:
+                # cancelled also ends the audio stream, so closing the
+                # generator early stops sending audio right away
+                for transcript, is_final, confidence in self._stream_recognize(cancelled):
+                    if cancelled.is_set():
+                        break
+                    
+                    result = STTResult(
+                        text=transcript,
+                        confidence=confidence,
+                        language=self.config.language,
+                        duration=time.time() - start_time,
+                        is_final=is_final
+                    )
+                    loop.call_soon_threadsafe(results.put_nowait, result)
+                    
+                    if is_final:
+                        break
+                        
+            except OSError as e:
+                logger.error(f"Microphone error: {e}")
+                self.close()
+            
+            except Exception as e:
+                logger.error(f"Streaming recognition error: {e}")
+            
+            finally:
+                self.is_recording = False
+                loop.call_soon_threadsafe(results.put_nowait, done)
+        
+        producer = loop.run_in_executor(None, produce)
+        last: Optional[STTResult] = None
+        
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                last = item
+                yield item
+            
+            # Always finish with a final result, even on timeout
+            if last is None or not last.is_final:
+                yield STTResult(
+                    text=last.text if last else "",
+                    confidence=last.confidence if last else 0.0,
+                    language=self.config.language,
+                    duration=last.duration if last else 0.0
+                )
+        finally:
+            cancelled.set()
+            await producer
     
     def listen(self) -> STTResult:
         """Listen and transcribe"""
@@ -42,28 +270,36 @@ class GoogleSTT(STTProvider):
         start_time = time.time()
         
         try:
-            with sr.Microphone() as source:
-                logger.debug(f"Listening (timeout={self.config.timeout}s, max={self.config.phrase_time_limit}s)...")
-                
+            if self._client is not None:
+                return self._listen_streaming(start_time)
+            
+            source = self._get_source()
+            logger.debug(f"Listening (timeout={self.config.timeout}s, max={self.config.phrase_time_limit}s)...")
+            
+            try:
                 audio = self.recognizer.listen(
                     source,
                     timeout=self.config.timeout,
                     phrase_time_limit=self.config.phrase_time_limit
                 )
-                
-                duration = time.time() - start_time
-                logger.debug(f"Recording complete ({duration:.1f}s)")
-                
-                # Transcribe
-                text = self.recognizer.recognize_google(audio, language=self.config.language)
-                
-                return STTResult(
-                    text=text,
-                    confidence=1.0,  # Google doesn't provide confidence
-                    language=self.config.language,
-                    duration=duration
-                )
-                
+            except OSError:
+                # Stream went away (device change, sleep); reopen next turn
+                self.close()
+                raise
+            
+            duration = time.time() - start_time
+            logger.debug(f"Recording complete ({duration:.1f}s)")
+            
+            # Transcribe
+            text = self.recognizer.recognize_google(audio, language=self.config.language)
+            
+            return STTResult(
+                text=text,
+                confidence=1.0,  # Google doesn't provide confidence
+                language=self.config.language,
+                duration=duration
+            )
+            
         except sr.WaitTimeoutError:
             logger.debug("Timeout waiting for speech")
             return STTResult(text="", duration=time.time() - start_time)
@@ -101,10 +337,11 @@ class GoogleSTT(STTProvider):
         logger.info(f"Adjusting for ambient noise ({duration}s)...")
         
         try:
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+            source = self._get_source()
+            self.recognizer.adjust_for_ambient_noise(source, duration=duration)
             
             logger.info(f"Energy threshold adjusted to {self.recognizer.energy_threshold}")
             
         except Exception as e:
-            logger.error(f"Noise adjustment failed: {e}")
\ No newline at end of file
+            logger.error(f"Noise adjustment failed: {e}")
+            self.close()
\ No newline at end of file
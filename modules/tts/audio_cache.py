@@ -0,0 +1,137 @@
+"""
+Text-to-Speech Module - Synthesized Audio Cache
+
+Keeps synthesized audio on disk so repeated phrases skip the network.
+"""
+
+import hashlib
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from utils.logger import get_logger
+
+logger = get_logger('tts.audio_cache')
+
+# Bytes written (as a fraction of max_bytes) before another prune runs
+PRUNE_SLACK = 0.1
+
+# In-progress writes older than this were left behind by a dead process
+STALE_PARTIAL_SECONDS = 300
+
+class AudioCache:
+    """
+    Size-capped on-disk cache of synthesized audio.
+
+    Entries are whole audio files named by key. File mtimes track
+    recency; least recently used entries are evicted by a background
+    thread so directory scans and deletes stay off the speak path.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, suffix: str = ".mp3"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+        # Unique side-file names for in-progress writes (pid guards other processes)
+        self._write_seq = itertools.count()
+        self._partial_prefix = f".{os.getpid()}."
+
+        # Prune requests coalesce into one pass on the background thread
+        self._written_since_prune = 0
+        self._prune_requested = threading.Event()
+        self._prune_requested.set()
+        threading.Thread(target=self._prune_loop, name="tts-cache-prune", daemon=True).start()
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Build a cache key from everything that affects the audio"""
+        joined = "|".join(str(part) for part in parts)
+        return hashlib.blake2b(joined.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read cached audio for key.
+
+        Returns:
+            Audio bytes on a cache hit, else None
+        """
+        cached = self._path(key)
+
+        try:
+            data = cached.read_bytes()
+            os.utime(cached)  # Mark as recently used
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.debug(f"Audio cache read failed: {e}")
+            return None
+
+    def put(self, key: str, data: bytes):
+        """Add freshly synthesized audio to the cache"""
+        cached = self._path(key)
+        partial = cached.with_name(f"{cached.name}{self._partial_prefix}{next(self._write_seq)}.tmp")
+
+        try:
+            # Write aside and rename so readers never see a partial file
+            partial.write_bytes(data)
+            os.replace(partial, cached)
+        except OSError as e:
+            logger.debug(f"Audio cache write failed: {e}")
+            partial.unlink(missing_ok=True)
+            return
+
+        self._written_since_prune += len(data)
+        if self._written_since_prune > self.max_bytes * PRUNE_SLACK:
+            self._written_since_prune = 0
+            self._prune_requested.set()
+
+    def _prune_loop(self):
+        """Background thread: prune whenever requested"""
+        while True:
+            self._prune_requested.wait()
+            self._prune_requested.clear()
+            self.prune()
+
+    def prune(self):
+        """Evict least recently used entries until under max_bytes"""
+        try:
+            stale_before = time.time() - STALE_PARTIAL_SECONDS
+            for path in self.cache_dir.glob(f"*{self.suffix}.*.tmp"):
+                try:
+                    if path.stat().st_mtime < stale_before:
+                        path.unlink(missing_ok=True)
+                except FileNotFoundError:
+                    continue  # Renamed into place or removed meanwhile
+
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob(f"*{self.suffix}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue  # Removed meanwhile (e.g. by another process)
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            for _, size, path in entries:
+                path.unlink(missing_ok=True)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+            logger.debug(f"Audio cache pruned to {total} bytes")
+
+        except OSError as e:
+            logger.debug(f"Audio cache prune failed: {e}")
@@ -4,10 +4,93 @@ Text-to-Speech Module - Base Interface
 Handles converting text to speech with customizable voices and settings.
 """
 
+import io
+import re
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional, List
 from dataclasses import dataclass
 from enum import Enum
+from modules.tts.audio_cache import AudioCache
+from utils.logger import get_logger
+
+try:
+    import pygame
+    PYGAME_AVAILABLE = True
+except ImportError:
+    PYGAME_AVAILABLE = False
+
+logger = get_logger('tts.base')
+
+# Sentence boundaries: whitespace after . ! ? except common abbreviations
+_SENTENCE_SPLIT_RE = re.compile(
+    r'(?<!\bMr\.)(?<!\bMrs\.)(?<!\bMs\.)(?<!\bDr\.)(?<!\bSt\.)'
+    r'(?<!\bvs\.)(?<!\be\.g\.)(?<!\bi\.e\.)'
+    r'(?<=[.!?])\s+'
+)
+
+# Clause boundaries used to shorten a long first sentence
+_CLAUSE_SPLIT_RE = re.compile(r'(?<=[,;:])\s+')
+
+# First sentences longer than this are spoken clause-first
+HEAD_MAX_WORDS = 12
+
+# Sentences synthesized ahead of the one currently playing
+PREFETCH_SENTENCES = 2
+
+# Mixer format shared with MusicPlayer (whichever initializes first wins);
+# 4096-sample buffer avoids underruns on PipeWire/PulseAudio
+MIXER_FREQUENCY = 44100
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 4096
+
+# Mixer channel reserved for speech (MusicPlayer plays on channel 0)
+SPEECH_CHANNEL = 1
+
+# Posted by pygame when the speech channel finishes a clip (see _play_audio)
+PLAYBACK_END_EVENT = pygame.USEREVENT + 1 if PYGAME_AVAILABLE else None
+
+# Longest a single clip may play before it is cut off
+MAX_PLAYBACK_SECONDS = 60
+
+def _speakable_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences worth synthesizing.
+    
+    Drops fragments without letters or digits (stray punctuation, emoji)
+    and immediate repeats, which would each cost a full TTS request.
+    """
+    sentences = []
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        sentence = sentence.strip()
+        if len(sentence) < 2 or not any(c.isalnum() for c in sentence):
+            continue
+        if sentences and sentence == sentences[-1]:
+            continue
+        sentences.append(sentence)
+    return sentences
+
+def _split_head(sentences: List[str]) -> List[str]:
+    """
+    Split the first clause off a long first sentence.
+    
+    Time to first audio is one synthesis of the first chunk, so a short
+    head starts playback sooner while the rest synthesizes behind it.
+    """
+    head = sentences[0]
+    if len(head.split()) <= HEAD_MAX_WORDS:
+        return sentences
+    
+    parts = _CLAUSE_SPLIT_RE.split(head, maxsplit=1)
+    if len(parts) < 2 or len(parts[0].split()) < 3:
+        return sentences
+    
+    return parts + sentences[1:]
 
 class VoiceGender(Enum):
     MALE = "male"
@@ -39,14 +122,97 @@ class TTSProvider(ABC):
     - Customizable voices
     - Streaming support
     - Provider-agnostic
+    
+    Sentence splitting, prefetching, the audio cache and pygame playback
+    live here; providers implement _synthesize (text to audio bytes) and
+    _cache_key.
     """
     
+    # Provider name used in log and console messages
+    display_name = "TTS"
+    
     def __init__(self, config: TTSConfig):
+        if not PYGAME_AVAILABLE:
+            raise ImportError(
+                "pygame not installed. Install with: pip install pygame"
+            )
+        
         self.config = config
         self.is_speaking = False
         self.available_voices: List[str] = []
+        self.audio_cache: Optional[AudioCache] = None
+        
+        # Long-lived synthesis workers shared by every stream_speak call
+        self._synth_pool = ThreadPoolExecutor(
+            max_workers=PREFETCH_SENTENCES,
+            thread_name_prefix=f"{type(self).__name__.lower()}-synth"
+        )
+        
+        # Initialize pygame mixer
+        if not pygame.mixer.get_init():
+            pygame.mixer.pre_init(MIXER_FREQUENCY, -16, MIXER_CHANNELS, MIXER_BUFFER)
+            pygame.mixer.init()
+        
+        # Sentence clips play as decoded Sounds on a dedicated channel
+        self._channel = pygame.mixer.Channel(SPEECH_CHANNEL)
+        
+        # Wake on the channel's end event instead of polling
+        self._end_event_enabled = self._init_end_event()
+    
+    def _init_audio_cache(self, cache_config: dict):
+        """Keep synthesized phrases on disk, reused across calls and restarts"""
+        self.temp_dir = Path(tempfile.gettempdir()) / "assistant_tts"
+        self.temp_dir.mkdir(exist_ok=True)
+        
+        if cache_config.get('enabled', True):
+            self.audio_cache = AudioCache(
+                self.temp_dir / "cache",
+                max_bytes=int(cache_config.get('max_mb', 50) * 1024 * 1024)
+            )
     
     @abstractmethod
+    def _synthesize(self, text: str, voice: VoiceProfile) -> bytes:
+        """
+        Synthesize text to encoded audio (e.g. MP3).
+        
+        Called from synthesis worker threads; errors are logged by
+        _generate_audio.
+        
+        Args:
+            text: Text to synthesize
+            voice: Voice to use
+            
+        Returns:
+            Audio file bytes
+        """
+        pass
+    
+    @abstractmethod
+    def _cache_key(self, text: str, voice: VoiceProfile) -> str:
+        """Audio cache key covering every setting that changes the audio"""
+        pass
+    
+    def _generate_audio(self, text: str, voice: VoiceProfile) -> Optional[io.BytesIO]:
+        """Generate audio in memory, from the cache when possible"""
+        try:
+            cache_key = None
+            if self.audio_cache:
+                cache_key = self._cache_key(text, voice)
+                cached = self.audio_cache.get(cache_key)
+                if cached is not None:
+                    return io.BytesIO(cached)
+            
+            audio = self._synthesize(text, voice)
+            
+            if cache_key:
+                self.audio_cache.put(cache_key, audio)
+            
+            return io.BytesIO(audio)
+            
+        except Exception as e:
+            logger.error(f"{self.display_name} audio generation error: {e}")
+            return None
+    
     def speak(self, text: str, voice: Optional[VoiceProfile] = None) -> bool:
         """
         Speak text (blocking).
@@ -58,9 +224,25 @@ class TTSProvider(ABC):
         Returns:
             True if successful
         """
-        pass
+        try:
+            self.is_speaking = True
+            
+            voice_to_use = voice or self.config.voice
+            audio = self._generate_audio(text, voice_to_use)
+            
+            if not audio:
+                return False
+            
+            self._play_audio(audio)
+            
+            self.is_speaking = False
+            return True
+            
+        except Exception as e:
+            logger.error(f"{self.display_name} speak error: {e}")
+            self.is_speaking = False
+            return False
     
-    @abstractmethod
     def speak_async(self, text: str, voice: Optional[VoiceProfile] = None):
         """
         Speak text (non-blocking).
@@ -69,9 +251,10 @@ class TTSProvider(ABC):
             text: Text to speak
             voice: Optional voice override
         """
-        pass
+        thread = threading.Thread(target=self.speak, args=(text, voice))
+        thread.daemon = True
+        thread.start()
     
-    @abstractmethod
     def stream_speak(self, text: str, voice: Optional[VoiceProfile] = None) -> bool:
         """
         Speak text with streaming (sentence-by-sentence).
@@ -83,12 +266,104 @@ class TTSProvider(ABC):
         Returns:
             True if successful
         """
-        pass
+        try:
+            self.is_speaking = True
+            
+            sentences = _speakable_sentences(text)
+            
+            if not sentences:
+                self.is_speaking = False
+                return False
+            
+            sentences = _split_head(sentences)
+            
+            logger.debug(f"Streaming {len(sentences)} sentences ({self.display_name})")
+            print(f"🔊 {self.display_name}: Streaming {len(sentences)} sentences")
+            
+            voice_to_use = voice or self.config.voice
+            
+            # Synthesize upcoming sentences while the current one plays;
+            # at most PREFETCH_SENTENCES are synthesized ahead of playback
+            pending = deque(
+                self._synth_pool.submit(self._generate_audio, sentence, voice_to_use)
+                for sentence in sentences[:PREFETCH_SENTENCES]
+            )
+            
+            try:
+                for i, sentence in enumerate(sentences):
+                    print(f"   📢 Sentence {i+1}/{len(sentences)}: {sentence[:50]}...")
+                    
+                    audio = pending.popleft().result()
+                    
+                    next_index = i + PREFETCH_SENTENCES
+                    if next_index < len(sentences):
+                        pending.append(self._synth_pool.submit(self._generate_audio, sentences[next_index], voice_to_use))
+                    
+                    if audio:
+                        self._play_audio(audio)
+            finally:
+                # Drop synthesis queued for sentences that never played
+                for future in pending:
+                    future.cancel()
+            
+            self.is_speaking = False
+            return True
+            
+        except Exception as e:
+            logger.error(f"{self.display_name} stream speak error: {e}")
+            self.is_speaking = False
+            return False
+    
+    def _init_end_event(self) -> bool:
+        """Register the end-of-clip event (needs pygame's event queue)"""
+        try:
+            if not pygame.display.get_init():
+                pygame.display.init()
+            self._channel.set_endevent(PLAYBACK_END_EVENT)
+            return True
+        except pygame.error as e:
+            logger.debug(f"Event queue unavailable, polling playback instead: {e}")
+            return False
+    
+    def _play_audio(self, audio: io.BytesIO):
+        """Play audio file with timeout protection"""
+        try:
+            # Decoded up front: no per-clip stream open/close, starts immediately
+            sound = pygame.mixer.Sound(file=audio)
+            self._channel.set_volume(self.config.voice.volume)
+            if self._end_event_enabled:
+                pygame.event.clear(PLAYBACK_END_EVENT)
+            self._channel.play(sound)
+            
+            # Wait with timeout
+            deadline = time.monotonic() + MAX_PLAYBACK_SECONDS
+            clock = None if self._end_event_enabled else pygame.time.Clock()
+            
+            while self._channel.get_busy():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("Playback timeout, stopping")
+                    self._channel.stop()
+                    break
+                
+                if clock is None:
+                    # Returns as soon as playback ends (re-checks every 500ms)
+                    event = pygame.event.wait(int(min(remaining, 0.5) * 1000))
+                    if event.type == PLAYBACK_END_EVENT:
+                        break
+                else:
+                    clock.tick(10)
+                
+        except Exception as e:
+            logger.error(f"Audio playback error: {e}")
     
-    @abstractmethod
     def stop(self):
         """Stop current speech"""
-        pass
+        try:
+            if self._channel.get_busy():
+                self._channel.stop()
+        except Exception as e:
+            logger.error(f"Stop error: {e}")
     
     @abstractmethod
     def list_voices(self) -> List[str]:
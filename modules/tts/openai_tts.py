@@ -3,23 +3,28 @@ OpenAI Text-to-Speech Implementation
 """
 
 import os
-import tempfile
-import time
-from pathlib import Path
-from typing import List, Optional
-import pygame
+import io
+import threading
+from typing import List
+import httpx
 from openai import OpenAI
 
-from modules.tts.base import TTSProvider, TTSConfig, VoiceProfile
+from modules.tts.base import TTSProvider, TTSConfig, VoiceProfile, PREFETCH_SENTENCES
+from modules.tts.audio_cache import AudioCache
 from utils.logger import get_logger
 from dotenv import load_dotenv
 
 logger = get_logger('tts.openai')
 
+# Bytes per read while streaming synthesized audio
+AUDIO_CHUNK_SIZE = 8192
+
 
 class OpenAITTS(TTSProvider):
     """OpenAI TTS implementation (gpt-4o-mini-tts)"""
 
+    display_name = "OpenAI TTS"
+
     def __init__(self, config: dict):
         # Ensure environment variables are loaded
         load_dotenv()
@@ -41,8 +46,7 @@ class OpenAITTS(TTSProvider):
 
         super().__init__(tts_config)
 
-        self.temp_dir = Path(tempfile.gettempdir()) / "assistant_tts"
-        self.temp_dir.mkdir(exist_ok=True)
+        self._init_audio_cache(config.get('cache', {}))
 
         # Get OpenAI settings
         openai_config = config.get('openai_tts', {})
@@ -54,131 +58,45 @@ class OpenAITTS(TTSProvider):
         if not api_key:
             raise ValueError("OpenAI API key not found in config or environment variables")
 
-        self.client = OpenAI(api_key=api_key)
-
-        # Initialize pygame mixer
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
-
-        logger.info(f"OpenAI TTS initialized (model={self.model}, voice={self.voice_name})")
-
-    def speak(self, text: str, voice: Optional[VoiceProfile] = None) -> bool:
-        """Speak text (blocking)"""
-        try:
-            self.is_speaking = True
-
-            voice_to_use = voice or self.config.voice
-            temp_file = self._generate_audio(text, voice_to_use)
-
-            if not temp_file:
-                return False
-
-            self._play_audio(temp_file)
-            self._cleanup_file(temp_file)
-
-            self.is_speaking = False
-            return True
-
-        except Exception as e:
-            logger.error(f"OpenAI TTS speak error: {e}")
-            self.is_speaking = False
-            return False
-
-    def speak_async(self, text: str, voice: Optional[VoiceProfile] = None):
-        """Speak asynchronously"""
-        import threading
-        thread = threading.Thread(target=self.speak, args=(text, voice))
-        thread.daemon = True
-        thread.start()
-
-    def stream_speak(self, text: str, voice: Optional[VoiceProfile] = None) -> bool:
-        """Speak text sentence-by-sentence"""
-        try:
-            self.is_speaking = True
-
-            import re
-            sentences = re.split(r'(?<=[.!?])\s+', text)
-            sentences = [s.strip() for s in sentences if s.strip()]
-
-            if not sentences:
-                return False
-
-            logger.debug(f"Streaming {len(sentences)} sentences (OpenAI)")
-            print(f"🔊 OpenAI TTS: Streaming {len(sentences)} sentences")
-
-            for i, sentence in enumerate(sentences):
-                print(f"   📢 Sentence {i+1}/{len(sentences)}: {sentence[:50]}...")
-                temp_file = self._generate_audio(sentence, voice or self.config.voice)
-                if temp_file:
-                    self._play_audio(temp_file)
-                    self._cleanup_file(temp_file)
-
-            self.is_speaking = False
-            return True
-
-        except Exception as e:
-            logger.error(f"OpenAI stream speak error: {e}")
-            self.is_speaking = False
-            return False
-
-    def _generate_audio(self, text: str, voice: VoiceProfile) -> Optional[str]:
-        """Generate audio from OpenAI TTS"""
-        try:
-            temp_file = self.temp_dir / f"tts_{int(time.time()*1000)}.mp3"
-
-            response = self.client.audio.speech.create(
-                model=self.model,
-                voice=self.voice_name,
-                input=text
+        # One pooled HTTP client, so sentences reuse the same TLS connection
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_keepalive_connections=PREFETCH_SENTENCES + 2,
+                keepalive_expiry=60
             )
+        )
+        self.client = OpenAI(api_key=api_key, http_client=self.http_client)
 
-            with open(temp_file, "wb") as f:
-                f.write(response.read())
-
-            return str(temp_file)
-
-        except Exception as e:
-            logger.error(f"OpenAI TTS audio generation error: {e}")
-            return None
-
-    def _play_audio(self, file_path: str):
-        """Play audio file"""
-        try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.set_volume(self.config.voice.volume)
-            pygame.mixer.music.play()
-
-            max_wait = 60
-            start = time.time()
-
-            while pygame.mixer.music.get_busy():
-                if time.time() - start > max_wait:
-                    logger.warning("Playback timeout, stopping")
-                    pygame.mixer.music.stop()
-                    break
-                pygame.time.Clock().tick(10)
-
-            pygame.mixer.music.unload()
+        # Open the pooled connection now so the first sentence skips the handshake
+        if openai_config.get('warmup', True):
+            threading.Thread(target=self._warm_up_connection, daemon=True).start()
 
-        except Exception as e:
-            logger.error(f"Audio playback error: {e}")
-
-    def _cleanup_file(self, file_path: str):
-        """Delete temporary file"""
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            logger.debug(f"Cleanup warning: {e}")
+        logger.info(f"OpenAI TTS initialized (model={self.model}, voice={self.voice_name})")
 
-    def stop(self):
-        """Stop playback"""
+    def _warm_up_connection(self):
+        """Establish TCP+TLS to the API host (response status is irrelevant)"""
         try:
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.stop()
-                pygame.mixer.music.unload()
+            self.http_client.head(str(self.client.base_url), timeout=5.0)
+            logger.debug("OpenAI TTS connection warmed up")
         except Exception as e:
-            logger.error(f"Stop error: {e}")
+            logger.debug(f"Connection warm-up failed: {e}")
+
+    def _cache_key(self, text: str, voice: VoiceProfile) -> str:
+        """Model and voice name change the audio"""
+        return AudioCache.key(self.model, self.voice_name, text)
+
+    def _synthesize(self, text: str, voice: VoiceProfile) -> bytes:
+        """Generate audio from OpenAI TTS in memory"""
+        # Collect audio as it arrives instead of one buffered read
+        audio = io.BytesIO()
+        with self.client.audio.speech.with_streaming_response.create(
+            model=self.model,
+            voice=self.voice_name,
+            input=text
+        ) as response:
+            for chunk in response.iter_bytes(chunk_size=AUDIO_CHUNK_SIZE):
+                audio.write(chunk)
+        return audio.getvalue()
 
     def list_voices(self) -> List[str]:
         """List available OpenAI voices"""
@@ -190,13 +108,8 @@ class OpenAITTS(TTSProvider):
         logger.info(f"Voice set to: {voice_name}")
 
     def __del__(self):
-        """Cleanup temp files"""
+        """Close the HTTP connection pool"""
         try:
-            if self.temp_dir.exists():
-                for file in self.temp_dir.glob("*.mp3"):
-                    try:
-                        file.unlink()
-                    except:
-                        pass
+            self.http_client.close()
         except:
             pass
@@ -1,23 +1,47 @@
 """
 Simple Wake Word Detection
 
-Uses Google Speech Recognition for wake word detection.
-Not as efficient as Porcupine/Vosk but works out of the box.
+Detects the wake word locally with Vosk when it and its model are
+installed; otherwise uses Google Speech Recognition, which works out of
+the box but sends audio over the network.
 """
 
+import re
 import speech_recognition as sr
+from typing import Optional
 from modules.wake_word.base import WakeWordDetector, WakeWordConfig
 from utils.logger import get_logger
 import time
 
+try:
+    from modules.wake_word.vosk import VoskWakeWord, VOSK_AVAILABLE
+except ImportError:
+    VOSK_AVAILABLE = False
+
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+
 logger = get_logger('wake_word.simple')
 
+# WebRTC VAD frame format (it accepts 10, 20 or 30ms frames of 16-bit PCM)
+VAD_SAMPLE_RATE = 16000
+VAD_FRAME_MS = 30
+
+# Voiced audio a phrase needs before it is sent for recognition
+MIN_VOICED_MS = 300
+
+# Ambient noise re-calibration interval across wake cycles
+CALIBRATION_INTERVAL_SECONDS = 300
+
 class SimpleWakeWord(WakeWordDetector):
     """
-    Simple wake word detector using Google STT.
+    Simple wake word detector (Vosk when available, else Google STT).
     
     Pros: Works immediately, no extra setup
-    Cons: Requires internet, uses more resources
+    Cons: Google fallback requires internet, uses more resources
     """
     
     def __init__(self, config: dict):
@@ -37,19 +61,88 @@ class SimpleWakeWord(WakeWordDetector):
         self.recognizer.dynamic_energy_threshold = True
         self.recognizer.pause_threshold = 0.8
         
+        # Wake word variants (fuzzy match), matched in a single regex pass
+        wake_words = [
+            self.config.wake_word.lower(),
+            self.config.wake_word.replace(" ", "").lower(),
+            # Common mishearings
+            "hey pie", "hay pi", "hey pee", "hey p"
+        ]
+        self._wake_re = re.compile('|'.join(re.escape(w) for w in wake_words))
+        
+        # Microphone held open from start() to stop()
+        self._mic: Optional[sr.Microphone] = None
+        self._mic_source = None
+        self._last_calibration: Optional[float] = None
+        
+        # Low power: drop phrases without speech before any network call
+        self._vad = None
+        if self.config.low_power_mode and WEBRTCVAD_AVAILABLE:
+            self._vad = webrtcvad.Vad(2)
+        
+        # Local keyword recognition, if Vosk and its model are present
+        self._vosk: Optional["VoskWakeWord"] = None
+        if VOSK_AVAILABLE:
+            try:
+                self._vosk = VoskWakeWord(config)
+            except Exception as e:
+                logger.info(f"Vosk unavailable, using Google STT: {e}")
+        
         logger.info(f"Simple wake word initialized (word='{self.config.wake_word}')")
         print(f"🎤 Wake word detector ready (say '{self.config.wake_word}')")
     
     def start(self):
         """Start listening"""
         self.is_listening = True
+        if self._vosk:
+            self._vosk.start()
         logger.debug("Wake word detector started")
     
     def stop(self):
         """Stop listening"""
         self.is_listening = False
+        if self._vosk:
+            self._vosk.stop()
+        self._close_microphone()
         logger.debug("Wake word detector stopped")
     
+    def _get_source(self):
+        """Open the microphone (once per start/stop cycle)"""
+        if self._mic_source is None:
+            mic = sr.Microphone()
+            self._mic_source = mic.__enter__()
+            self._mic = mic
+        return self._mic_source
+    
+    def _close_microphone(self):
+        """Release the microphone so STT can open the device"""
+        if self._mic is not None:
+            try:
+                self._mic.__exit__(None, None, None)
+            except Exception as e:
+                logger.debug(f"Microphone close failed: {e}")
+            finally:
+                self._mic = None
+                self._mic_source = None
+    
+    def _has_speech(self, audio: sr.AudioData) -> bool:
+        """Check a captured phrase for at least MIN_VOICED_MS of speech"""
+        if self._vad is None:
+            return True
+        
+        pcm = audio.get_raw_data(convert_rate=VAD_SAMPLE_RATE, convert_width=2)
+        frame_bytes = VAD_SAMPLE_RATE * VAD_FRAME_MS // 1000 * 2
+        needed = MIN_VOICED_MS // VAD_FRAME_MS
+        voiced = 0
+        
+        for start in range(0, len(pcm) - frame_bytes + 1, frame_bytes):
+            if self._vad.is_speech(pcm[start:start + frame_bytes], VAD_SAMPLE_RATE):
+                voiced += 1
+                if voiced >= needed:
+                    return True
+        
+        return False
+    
     def wait_for_wake_word(self) -> bool:
         """
         Wait for wake word detection (blocking).
@@ -57,51 +150,55 @@ class SimpleWakeWord(WakeWordDetector):
         Returns:
             True if detected, False if timeout
         """
+        if self._vosk:
+            return self._vosk.wait_for_wake_word()
+        
         logger.debug(f"Listening for '{self.config.wake_word}'...")
         print(f"👂 Listening for '{self.config.wake_word}'...")
         
-        with sr.Microphone() as source:
-            # Quick ambient noise adjustment
+        source = self._get_source()
+        
+        # Ambient noise calibration carries over between wake cycles
+        now = time.monotonic()
+        if self._last_calibration is None or now - self._last_calibration > CALIBRATION_INTERVAL_SECONDS:
             self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            
-            while self.is_listening:
-                try:
-                    # Listen for short phrases (wake word should be short)
-                    audio = self.recognizer.listen(
-                        source,
-                        timeout=None,  # Wait indefinitely
-                        phrase_time_limit=3  # Max 3 seconds per phrase
-                    )
-                    
-                    # Recognize
-                    text = self.recognizer.recognize_google(audio).lower()
-                    logger.debug(f"Heard: {text}")
-                    
-                    # Check for wake word (fuzzy match)
-                    wake_words = [
-                        self.config.wake_word.lower(),
-                        self.config.wake_word.replace(" ", "").lower(),
-                        # Common mishearings
-                        "hey pie", "hay pi", "hey pee", "hey p"
-                    ]
-                    
-                    if any(wake in text for wake in wake_words):
-                        logger.info(f"Wake word detected: '{text}'")
-                        print(f"Wake word detected!")
-                        return True
-                    
-                except sr.WaitTimeoutError:
-                    continue
-                except sr.UnknownValueError:
-                    continue
-                except sr.RequestError as e:
-                    logger.error(f"Speech recognition error: {e}")
-                    time.sleep(1)
-                    continue
-                except Exception as e:
-                    logger.error(f"Wake word error: {e}")
-                    time.sleep(1)
+            self._last_calibration = now
+        
+        while self.is_listening:
+            try:
+                # Listen for short phrases (wake word should be short)
+                audio = self.recognizer.listen(
+                    source,
+                    timeout=None,  # Wait indefinitely
+                    phrase_time_limit=3  # Max 3 seconds per phrase
+                )
+                
+                # Noise that tripped the energy threshold isn't worth a request
+                if not self._has_speech(audio):
                     continue
+                
+                # Recognize
+                text = self.recognizer.recognize_google(audio).lower()
+                logger.debug(f"Heard: {text}")
+                
+                # Check for wake word (fuzzy match)
+                if self._wake_re.search(text):
+                    logger.info(f"Wake word detected: '{text}'")
+                    print(f"Wake word detected!")
+                    return True
+                
+            except sr.WaitTimeoutError:
+                continue
+            except sr.UnknownValueError:
+                continue
+            except sr.RequestError as e:
+                logger.error(f"Speech recognition error: {e}")
+                time.sleep(1)
+                continue
+            except Exception as e:
+                logger.error(f"Wake word error: {e}")
+                time.sleep(1)
+                continue
         
         return False
     
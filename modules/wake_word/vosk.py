@@ -1,40 +1,177 @@
-# Module: modules/wake_word/vosk.py
-from modules.wake_word.base import WakeWordDetector, WakeWordConfig
-import vosk
+"""
+Vosk Wake Word Detection
+
+Offline wake word detection with a Vosk recognizer restricted to the
+wake phrase. Audio never leaves the device.
+"""
+
+import json
+import queue
+import time
+from pathlib import Path
+from typing import Optional
+
 import sounddevice as sd
+from modules.wake_word.base import WakeWordDetector, WakeWordConfig
+from utils.logger import get_logger
+
+try:
+    import vosk
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+logger = get_logger('wake_word.vosk')
+
+# Samples per audio block handed to the recognizer (250ms at 16kHz)
+BLOCK_SIZE = 4000
+
+# Audio blocks buffered between the audio callback and the recognizer
+AUDIO_QUEUE_SIZE = 32
 
 class VoskWakeWord(WakeWordDetector):
     """
     Vosk-based wake word detection.
+
+    The recognizer's grammar is just the wake phrase plus "[unk]", so
+    decoding is a tiny finite-state search instead of full dictation.
     """
-    def __init__(self, config: WakeWordConfig):
-        super().__init__(config)
-        self.model = vosk.Model(config.vosk['model_path'])
-        self.sensitivity = config.sensitivity
-        self.sample_rate = config.sample_rate
-        self.stream = None
+
+    def __init__(self, config: dict):
+        if not VOSK_AVAILABLE:
+            raise ImportError(
+                "Vosk not installed. Install with: pip install vosk"
+            )
+
+        # Build config
+        wake_config = WakeWordConfig(
+            wake_word=config.get('wake_word', 'hey pi'),
+            sensitivity=config.get('sensitivity', 0.5),
+            timeout=config.get('timeout'),
+            low_power_mode=config.get('low_power_mode', True),
+            sample_rate=config.get('sample_rate', 16000)
+        )
+
+        super().__init__(wake_config)
+
+        vosk_config = config.get('vosk', {})
+        model_path = vosk_config.get('model_path', 'models/vosk-model-small-en-us-0.15')
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"Vosk model not found: {model_path}")
+
+        self.confidence_threshold = vosk_config.get('confidence_threshold', 0.8)
+        # Sensitive setups also accept partial hypotheses (faster, less strict)
+        self.match_partials = self.config.sensitivity >= 0.5
+        self.wake_phrase = self.config.wake_word.lower()
+        self.grammar = json.dumps([self.wake_phrase, "[unk]"])
+
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)
+
+        self.stream: Optional[sd.RawInputStream] = None
+        self._audio: "queue.Queue[bytes]" = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+
+        logger.info(f"Vosk wake word initialized (word='{self.config.wake_word}', model={model_path})")
 
     def start(self):
+        """Start listening"""
+        if self.stream:
+            return
+
         self.is_listening = True
-        self.stream = sd.InputStream(samplerate=self.sample_rate, channels=1, callback=self._callback_wrapper)
+        self._audio = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+        self.stream = sd.RawInputStream(
+            samplerate=self.config.sample_rate,
+            blocksize=BLOCK_SIZE,
+            dtype='int16',
+            channels=1,
+            callback=self._callback_wrapper
+        )
         self.stream.start()
+        logger.debug("Wake word detector started")
 
     def stop(self):
+        """Stop listening"""
         self.is_listening = False
         if self.stream:
             self.stream.stop()
             self.stream.close()
             self.stream = None
+        logger.debug("Wake word detector stopped")
 
     def _callback_wrapper(self, indata, frames, time, status):
+        """Audio callback: hand raw 16-bit frames to the recognizer thread"""
         if not self.is_listening:
             return
-        # simple detection logic
-        # TODO: add Vosk wake word detection here
+
+        try:
+            self._audio.put_nowait(bytes(indata))
+        except queue.Full:
+            pass  # Recognizer fell behind; drop the block rather than block audio
+
+    def _is_wake_phrase(self, result: dict) -> bool:
+        """Check a final recognizer result against the confidence threshold"""
+        if self.wake_phrase not in result.get('text', ''):
+            return False
+
+        words = result.get('result') or []
+        if not words:
+            return True
+
+        confidence = sum(w.get('conf', 1.0) for w in words) / len(words)
+        return confidence >= self.confidence_threshold
 
     def wait_for_wake_word(self) -> bool:
-        # blocking loop waiting for wake word
-        return True  # placeholder
+        """
+        Wait for wake word detection (blocking).
+
+        Returns:
+            True if detected, False if timeout or stopped
+        """
+        logger.debug(f"Listening for '{self.config.wake_word}'...")
+        print(f"👂 Listening for '{self.config.wake_word}'...")
+
+        if not self.stream:
+            self.start()
+
+        recognizer = vosk.KaldiRecognizer(self.model, self.config.sample_rate, self.grammar)
+        recognizer.SetWords(True)
+
+        deadline = None
+        if self.config.timeout:
+            deadline = time.monotonic() + self.config.timeout
+
+        while self.is_listening:
+            if deadline and time.monotonic() > deadline:
+                return False
+
+            try:
+                data = self._audio.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if recognizer.AcceptWaveform(data):
+                result = json.loads(recognizer.Result())
+                logger.debug(f"Heard: {result.get('text', '')}")
+                detected = self._is_wake_phrase(result)
+            elif self.match_partials:
+                # Partial hypotheses fire mid-utterance, before the endpoint
+                partial = json.loads(recognizer.PartialResult()).get('partial', '')
+                detected = self.wake_phrase in partial
+            else:
+                detected = False
+
+            if detected:
+                logger.info("Wake word detected")
+                print("Wake word detected!")
+                return True
+
+        return False
 
     def get_resource_usage(self) -> dict:
-        return {"cpu_percent": 0, "memory_mb": 0}
+        """Get resource usage (basic info)"""
+        return {
+            'cpu_percent': 0,  # Would need psutil
+            'memory_mb': 0,
+            'active': self.is_listening
+        }
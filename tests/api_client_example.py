@@ -8,9 +8,35 @@ Then run these examples:
     python api_client_example.py
 """
 
+import asyncio
 import requests
 import json
-from typing import Optional
+import httpx
+from typing import Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 class AssistantAPIClient:
@@ -25,6 +51,19 @@ class AssistantAPIClient:
         """
         self.base_url = base_url
         self.session_id: Optional[str] = None
+        
+        # Keep-alive connection pool, shared by threads using this client
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        )
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+        
+        # Async client for concurrent chats (created on first chat_async)
+        self._async_http: Optional[httpx.AsyncClient] = None
     
     def health_check(self) -> dict:
         """
@@ -33,9 +72,9 @@ class AssistantAPIClient:
         Returns:
             Health status dictionary
         """
-        response = requests.get(f"{self.base_url}/health")
+        response = self._http.get(f"{self.base_url}/health")
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def chat(
         self, 
@@ -54,24 +93,75 @@ class AssistantAPIClient:
         Returns:
             Response dictionary
         """
+        response = self._http.post(
+            f"{self.base_url}/chat",
+            data=_dumps(self._chat_payload(message, user_id, session_id)),
+            headers=JSON_HEADERS
+        )
+        response.raise_for_status()
+        
+        return self._handle_chat_response(_loads(response.content))
+    
+    async def chat_async(
+        self,
+        message: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None
+    ) -> dict:
+        """
+        Send a chat message without blocking the event loop.
+        
+        Many calls can run at once with asyncio.gather; they share one
+        pool of keep-alive connections. Call aclose() when done.
+        
+        Args:
+            message: Message to send
+            user_id: User identifier
+            session_id: Session identifier (optional)
+        
+        Returns:
+            Response dictionary
+        """
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=60.0
+            )
+        
+        response = await self._async_http.post(
+            f"{self.base_url}/chat",
+            content=_dumps(self._chat_payload(message, user_id, session_id)),
+            headers=JSON_HEADERS
+        )
+        response.raise_for_status()
+        
+        return self._handle_chat_response(_loads(response.content))
+    
+    async def aclose(self):
+        """Close the async connection pool"""
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+    
+    def _chat_payload(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str]
+    ) -> dict:
+        """Build the /chat request body"""
         # Use stored session_id if not provided
         if session_id is None:
             session_id = self.session_id
         
-        payload = {
+        return {
             "message": message,
             "user_id": user_id,
             "session_id": session_id
         }
-        
-        response = requests.post(
-            f"{self.base_url}/chat",
-            json=payload
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        
+    
+    def _handle_chat_response(self, data: dict) -> dict:
+        """Remember the session from a /chat response"""
         # Store session_id for next request
         if 'session_id' in data.get('metadata', {}):
             self.session_id = data['metadata']['session_id']
@@ -85,20 +175,20 @@ class AssistantAPIClient:
         Returns:
             Stats dictionary
         """
-        response = requests.get(f"{self.base_url}/stats")
+        response = self._http.get(f"{self.base_url}/stats")
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
 
 
 # ===== Example Usage =====
 
-def example_health_check():
+def example_health_check(client: Optional[AssistantAPIClient] = None):
     """Example: Health check"""
     print("\n" + "="*60)
     print("Example 1: Health Check")
     print("="*60)
     
-    client = AssistantAPIClient()
+    client = client or AssistantAPIClient()
     
     try:
         health = client.health_check()
@@ -109,13 +199,13 @@ def example_health_check():
         print(f"❌ Health check failed: {e}")
 
 
-def example_simple_chat():
+def example_simple_chat(client: Optional[AssistantAPIClient] = None):
     """Example: Simple chat"""
     print("\n" + "="*60)
     print("Example 2: Simple Chat")
     print("="*60)
     
-    client = AssistantAPIClient()
+    client = client or AssistantAPIClient()
     
     messages = [
         "Hello!",
@@ -139,13 +229,13 @@ def example_simple_chat():
             print(f"❌ Error: {e}")
 
 
-def example_web_search():
+def example_web_search(client: Optional[AssistantAPIClient] = None):
     """Example: Web search"""
     print("\n" + "="*60)
     print("Example 3: Web Search")
     print("="*60)
     
-    client = AssistantAPIClient()
+    client = client or AssistantAPIClient()
     
     query = "What's the weather in Tokyo?"
     print(f"\nUser: {query}")
@@ -161,13 +251,13 @@ def example_web_search():
         print(f"❌ Error: {e}")
 
 
-def example_memory_context():
+def example_memory_context(client: Optional[AssistantAPIClient] = None):
     """Example: Using memory context"""
     print("\n" + "="*60)
     print("Example 4: Memory Context")
     print("="*60)
     
-    client = AssistantAPIClient()
+    client = client or AssistantAPIClient()
     
     # First, tell the assistant something
     print("\nUser: My name is Alice")
@@ -190,13 +280,13 @@ def example_memory_context():
         print(f"❌ Error: {e}")
 
 
-def example_stats():
+def example_stats(client: Optional[AssistantAPIClient] = None):
     """Example: Get statistics"""
     print("\n" + "="*60)
     print("Example 5: System Statistics")
     print("="*60)
     
-    client = AssistantAPIClient()
+    client = client or AssistantAPIClient()
     
     try:
         stats = client.get_stats()
@@ -223,13 +313,13 @@ def example_stats():
         print(f"❌ Error: {e}")
 
 
-def example_action_execution():
+def example_action_execution(client: Optional[AssistantAPIClient] = None):
     """Example: Execute action"""
     print("\n" + "="*60)
     print("Example 6: Action Execution")
     print("="*60)
     
-    client = AssistantAPIClient()
+    client = client or AssistantAPIClient()
     
     # Try a system action
     print("\nUser: volume up")
@@ -244,16 +334,15 @@ def example_action_execution():
         print(f"❌ Error: {e}")
 
 
-def example_batch_requests():
+def example_batch_requests(client: Optional[AssistantAPIClient] = None):
     """Example: Multiple parallel requests"""
     print("\n" + "="*60)
     print("Example 7: Batch Requests")
     print("="*60)
     
-    from concurrent.futures import ThreadPoolExecutor
     import time
     
-    client = AssistantAPIClient()
+    client = client or AssistantAPIClient()
     
     messages = [
         "What's 2+2?",
@@ -262,19 +351,25 @@ def example_batch_requests():
         "What's 5+5?"
     ]
     
-    def send_message(msg):
+    async def send_message(msg):
         """Helper to send message"""
         try:
-            return client.chat(msg)
+            return await client.chat_async(msg)
         except Exception as e:
             return {"error": str(e)}
     
+    async def send_all():
+        """Send every message at once on one event loop"""
+        try:
+            return await asyncio.gather(*(send_message(msg) for msg in messages))
+        finally:
+            await client.aclose()
+    
     print(f"\nSending {len(messages)} requests in parallel...")
     
     start = time.time()
     
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        results = list(executor.map(send_message, messages))
+    results = asyncio.run(send_all())
     
     duration = time.time() - start
     
@@ -337,14 +432,17 @@ Press Ctrl+C to stop.
     
     input("Press Enter to start examples...")
     
+    # One client for every example: shared connections and session
+    client = AssistantAPIClient()
+    
     try:
-        example_health_check()
-        example_simple_chat()
-        example_web_search()
-        example_memory_context()
-        example_stats()
-        example_action_execution()
-        example_batch_requests()
+        example_health_check(client)
+        example_simple_chat(client)
+        example_web_search(client)
+        example_memory_context(client)
+        example_stats(client)
+        example_action_execution(client)
+        example_batch_requests(client)
         example_curl_commands()
         
         print("\n" + "="*60)
@@ -6,11 +6,13 @@ Tests OpenAI and Ollama providers to verify abstraction works.
 """
 
 import asyncio
+import contextvars
+import io
 import sys
 from pathlib import Path
 
 # Add project root to path
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from core.ai import (
     AIProviderFactory, 
@@ -23,6 +25,55 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Providers shared by every test, keyed by (kind, config)
+_providers = {}
+
+
+def _get_provider(kind: str, **config):
+    """Create a provider once and reuse it (and its HTTP client) across tests"""
+    key = (kind, tuple(sorted(config.items())))
+    if key not in _providers:
+        _providers[key] = AIProviderFactory.create(kind, **config)
+    return _providers[key]
+
+
+# Output buffer of the test running in the current task (None = stdout)
+_output = contextvars.ContextVar('_output', default=None)
+
+
+class _TaskStdout:
+    """sys.stdout stand-in that writes to the current task's buffer"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return (_output.get() or self._stream).write(text)
+    
+    def flush(self):
+        if _output.get() is None:
+            self._stream.flush()
+
+
+async def _run_buffered(test):
+    """Run one test, then print its output as a single block"""
+    buffer = io.StringIO()
+    _output.set(buffer)  # gather runs each test in its own task/context
+    try:
+        return await test()
+    finally:
+        _output.set(None)
+        print(buffer.getvalue(), end="", flush=True)
+
+
+async def _close_providers():
+    """Release HTTP clients held by shared providers"""
+    for provider in _providers.values():
+        close = getattr(provider, 'close', None)
+        if close:
+            await close()
+    _providers.clear()
+
 
 async def test_openai():
     """Test OpenAI provider"""
@@ -31,7 +82,7 @@ async def test_openai():
     print("="*60)
     
     try:
-        provider = AIProviderFactory.create(
+        provider = _get_provider(
             "openai",
             model="gpt-4o-mini"
         )
@@ -80,7 +131,7 @@ async def test_ollama():
     print("="*60)
     
     try:
-        provider = AIProviderFactory.create(
+        provider = _get_provider(
             "ollama",
             model="llama3:8b",
             base_url="http://localhost:11434"
@@ -129,7 +180,7 @@ async def test_default_provider():
     
     try:
         # Set default to OpenAI
-        provider = AIProviderFactory.create("openai", model="gpt-4o-mini")
+        provider = _get_provider("openai", model="gpt-4o-mini")
         set_default_provider(provider)
         print("✓ Set OpenAI as default provider")
         
@@ -162,7 +213,7 @@ async def test_provider_switching():
     
     try:
         # Create both providers
-        openai = AIProviderFactory.create("openai", model="gpt-4o-mini")
+        openai = _get_provider("openai", model="gpt-4o-mini")
         
         print("✓ Created OpenAI provider")
         
@@ -171,19 +222,27 @@ async def test_provider_switching():
         
         print(f"\n1. Question: {question}")
         
+        # Ask both at once; Ollama may not be available
+        ollama = _get_provider("ollama", model="llama3:8b")
+        response1, response2 = await asyncio.gather(
+            openai.complete(question),
+            ollama.complete(question),
+            return_exceptions=True
+        )
+        
+        if isinstance(response1, Exception):
+            raise response1
         print("\n   OpenAI response:")
-        response1 = await openai.complete(question)
         print(f"   → {response1.content}")
         
-        # Try Ollama if available
-        try:
-            ollama = AIProviderFactory.create("ollama", model="llama3:8b")
+        if isinstance(response2, ConnectionError):
+            print("\n   (Ollama not available - skipping comparison)")
+        elif isinstance(response2, Exception):
+            raise response2
+        else:
             print("\n   Ollama response:")
-            response2 = await ollama.complete(question)
             print(f"   → {response2.content}")
             print("\n✓ Both providers gave answers (content may differ)")
-        except ConnectionError:
-            print("\n   (Ollama not available - skipping comparison)")
         
         print("\n✅ Provider switching: TEST PASSED")
         return True
@@ -201,19 +260,30 @@ async def main():
     ╚════════════════════════════════════════╝
     """)
     
-    results = []
-    
-    # Test OpenAI (should always work if API key is set)
-    results.append(("OpenAI", await test_openai()))
-    
-    # Test Ollama (may not be available)
-    results.append(("Ollama", await test_ollama()))
+    tests = [
+        ("OpenAI", test_openai),                        # Should work if API key is set
+        ("Ollama", test_ollama),                        # May not be available
+        ("Default Provider", test_default_provider),
+        ("Provider Switching", test_provider_switching),
+    ]
     
-    # Test default provider system
-    results.append(("Default Provider", await test_default_provider()))
+    # The suites are independent and network-bound, so run them together;
+    # each one's output is buffered and printed when it finishes
+    real_stdout = sys.stdout
+    sys.stdout = _TaskStdout(real_stdout)
+    try:
+        outcomes = await asyncio.gather(
+            *(_run_buffered(test) for _, test in tests),
+            return_exceptions=True
+        )
+    finally:
+        sys.stdout = real_stdout
+        await _close_providers()
     
-    # Test switching
-    results.append(("Provider Switching", await test_provider_switching()))
+    results = [
+        (name, outcome is True)
+        for (name, _), outcome in zip(tests, outcomes)
+    ]
     
     # Summary
     print("\n" + "="*60)
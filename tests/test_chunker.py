@@ -0,0 +1,81 @@
+"""
+Test SmartChunker streaming
+
+chunk_stream() must yield exactly what chunk() returns for the joined
+text, however the text is split into parts and flushed.
+"""
+
+import random
+
+import pytest
+
+from modules.rag import chunker as chunker_module
+from modules.rag.base import ChunkStrategy
+from modules.rag.chunker import SmartChunker
+
+
+def _random_text(rng: random.Random, words: int, sentence_words: int) -> str:
+    """
+    Sentences averaging sentence_words words (many longer than a chunk),
+    grouped into paragraphs
+    """
+    pieces = []
+    capitalize = True
+    for _ in range(words):
+        word = "".join(rng.choice("abcdefghij") for _ in range(rng.randint(1, 8)))
+        if capitalize:
+            word = word.capitalize()
+        capitalize = rng.random() < 1 / sentence_words
+        if not capitalize:
+            pieces.append(word + " ")
+        elif rng.random() < 0.2:
+            pieces.append(word + ".\n\n")
+        else:
+            pieces.append(word + rng.choice(".?!") + " ")
+    return "".join(pieces)
+
+
+def _random_parts(rng: random.Random, text: str):
+    """Split text into randomly sized parts"""
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 700)
+        yield text[i:i + size]
+        i += size
+
+
+class TestChunkStream:
+    """chunk_stream() / chunk() equivalence"""
+
+    @pytest.fixture
+    def small_flush(self, monkeypatch):
+        """Flush often so a short text crosses many flush boundaries"""
+        monkeypatch.setattr(chunker_module, "STREAM_FLUSH_CHARS", 300)
+
+    @pytest.mark.parametrize("strategy", list(ChunkStrategy))
+    @pytest.mark.parametrize("seed", range(20))
+    def test_stream_matches_chunk(self, small_flush, strategy, seed):
+        """Same chunks for every strategy, including over-long sentences"""
+        rng = random.Random(seed)
+        chunker = SmartChunker(chunk_size=rng.randint(20, 80), overlap=rng.randint(5, 20), strategy=strategy)
+        text = _random_text(rng, rng.randint(200, 3000), sentence_words=rng.choice([8, 40]))
+
+        assert list(chunker.chunk_stream(_random_parts(rng, text))) == chunker.chunk(text)
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_stream_matches_chunk_default_config(self, seed):
+        """Default chunker and flush size, text well past one flush"""
+        rng = random.Random(seed)
+        chunker = SmartChunker()
+        text = _random_text(rng, 40000, sentence_words=600)
+
+        assert list(chunker.chunk_stream(_random_parts(rng, text))) == chunker.chunk(text)
+
+    def test_stream_empty(self):
+        """No text, no chunks"""
+        assert list(SmartChunker().chunk_stream(["", "  ", "\n"])) == []
+
+
+# Run tests
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
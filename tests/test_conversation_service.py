@@ -13,42 +13,65 @@ from modules.intent.base import IntentResult, IntentType
 from modules.actions.base import ActionResult
 
 
+def _set_mock_defaults(detector, registry, memory, rag):
+    """(Re)apply the return values every test starts from"""
+    registry.get_all_actions.return_value = {}
+    registry.list_actions.return_value = []
+    memory.retrieve_context.return_value = []
+    memory.format_context_for_prompt.return_value = ""
+    rag.retrieve.return_value = []
+    rag.format_context.return_value = ""
+
+
 class TestConversationService:
     """Test suite for ConversationService"""
     
-    @pytest.fixture
+    # Mocks are built once per module; reset_mocks restores them per test.
+    # Async tests share one session-wide event loop instead of one per test.
+    
+    @pytest.fixture(scope="module")
     def mock_intent_detector(self):
         """Mock intent detector"""
         detector = Mock()
         detector.detect = AsyncMock()
         return detector
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_action_registry(self):
         """Mock action registry"""
         registry = Mock()
         registry.find_action_for_prompt = Mock()
-        registry.get_all_actions = Mock(return_value={})
-        registry.list_actions = Mock(return_value=[])
+        registry.get_all_actions = Mock()
+        registry.list_actions = Mock()
         return registry
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_memory_manager(self):
         """Mock memory manager"""
         memory = Mock()
-        memory.retrieve_context = AsyncMock(return_value=[])
-        memory.format_context_for_prompt = Mock(return_value="")
+        memory.retrieve_context = AsyncMock()
+        memory.format_context_for_prompt = Mock()
         memory.process_conversation = AsyncMock()
         return memory
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_rag_retriever(self):
         """Mock RAG retriever"""
         rag = Mock()
-        rag.retrieve = AsyncMock(return_value=[])
-        rag.format_context = Mock(return_value="")
+        rag.retrieve = AsyncMock()
+        rag.format_context = Mock()
         return rag
     
+    @pytest.fixture(autouse=True)
+    def reset_mocks(self, mock_intent_detector, mock_action_registry,
+                    mock_memory_manager, mock_rag_retriever):
+        """Clear calls, return values and side effects left by the last test"""
+        mocks = (mock_intent_detector, mock_action_registry,
+                 mock_memory_manager, mock_rag_retriever)
+        for mock in mocks:
+            mock.reset_mock(return_value=True, side_effect=True)
+        _set_mock_defaults(*mocks)
+    
     @pytest.fixture
     def service(self, mock_intent_detector, mock_action_registry, 
                 mock_memory_manager, mock_rag_retriever):
@@ -60,7 +83,7 @@ class TestConversationService:
             rag_retriever=mock_rag_retriever
         )
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_process_input_basic(self, service, mock_intent_detector):
         """Test basic input processing"""
         # Setup
@@ -93,7 +116,7 @@ class TestConversationService:
         assert result['action_executed'] is None
         assert isinstance(result['duration_ms'], float)
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_process_input_action(self, service, mock_intent_detector, 
                                        mock_action_registry):
         """Test action execution"""
@@ -123,7 +146,7 @@ class TestConversationService:
         assert result['intent'] == 'Action'
         assert result['action_executed'] == "LightAction"
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_process_input_with_memory(self, service, mock_intent_detector,
                                             mock_memory_manager):
         """Test that memory is retrieved and stored"""
@@ -176,7 +199,7 @@ class TestConversationService:
         assert mock_memory_manager.retrieve_context.called
         assert mock_memory_manager.process_conversation.called
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_process_input_error_handling(self, service, mock_intent_detector):
         """Test error handling"""
         # Setup - make intent detector fail
@@ -191,7 +214,7 @@ class TestConversationService:
         assert 'error' in result['response'].lower()
         assert 'error' in result['metadata']
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_service_without_memory(self, mock_intent_detector, 
                                          mock_action_registry):
         """Test service works without memory system"""
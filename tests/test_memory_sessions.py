@@ -7,22 +7,70 @@ Run with: pytest tests/test_memory_sessions.py -v
 
 import pytest
 import asyncio
+import hashlib
+import math
 import tempfile
+import threading
 import os
 from datetime import datetime, timedelta
 
+from core.ai import AIProvider, AIProviderConfig, AIResponse
 from modules.memory.memory_manager import MemoryManager
-from modules.memory.base import MemoryCategory
+from modules.memory.base import Conversation, MemoryCategory
+
+
+class HashEmbeddingFunction:
+    """Deterministic stand-in for the embedding model (nothing to load)"""
+
+    def __call__(self, input):
+        embeddings = []
+        for text in input:
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=64).digest()
+            vector = [b - 127.5 for b in digest]
+            norm = math.sqrt(sum(x * x for x in vector))
+            embeddings.append([x / norm for x in vector])
+        return embeddings
+
+
+class StubAIProvider(AIProvider):
+    """Offline AI provider: classifies every turn as CONVERSATIONAL"""
+
+    REPLY = '{"category": "CONVERSATIONAL", "importance_score": 0.5, "reasoning": "stub"}'
+
+    def __init__(self):
+        super().__init__(AIProviderConfig(provider_name="stub", model="stub"))
+
+    async def complete(self, prompt, system_prompt=None, temperature=None,
+                       max_tokens=None, **kwargs) -> AIResponse:
+        return AIResponse(content=self.REPLY, model="stub")
+
+    async def chat(self, messages, temperature=None, max_tokens=None,
+                   **kwargs) -> AIResponse:
+        return AIResponse(content=self.REPLY, model="stub")
+
+    async def stream_chat(self, messages, temperature=None, max_tokens=None,
+                          **kwargs):
+        yield self.REPLY
+
+    def get_model_info(self):
+        return {"provider": "stub", "model": "stub"}
 
 
 @pytest.fixture
-def temp_memory():
+def temp_memory(monkeypatch):
     """Create temporary memory manager for testing"""
+    # The classifier uses the default AI provider; keep it offline
+    monkeypatch.setattr("core.ai.base._default_provider", StubAIProvider())
+    
     with tempfile.TemporaryDirectory() as tmpdir:
         db_path = os.path.join(tmpdir, "test_memory.db")
         vector_path = os.path.join(tmpdir, "test_chromadb")
         
-        memory = MemoryManager(db_path=db_path, vector_path=vector_path)
+        memory = MemoryManager(
+            db_path=db_path,
+            vector_path=vector_path,
+            embedding_function=HashEmbeddingFunction()
+        )
         yield memory
 
 
@@ -261,7 +309,39 @@ class TestConversationHistory:
         assert len(history) == 5
         assert history[0].turn_no == 1
         assert history[-1].turn_no == 5
-    
+
+    @pytest.mark.asyncio
+    async def test_bulk_processing_keeps_turn_order(self, temp_memory):
+        """Bulk processing should store turns in order, per session"""
+        desktop = MemoryManager.generate_session_id("user1", "desktop")
+        pi = MemoryManager.generate_session_id("user1", "pi")
+
+        turns = [
+            {
+                "user_input": f"Question {i}",
+                "assistant_response": f"Answer {i}",
+                "session_id": desktop if i % 2 == 0 else pi,
+                "user_id": "user1"
+            }
+            for i in range(6)
+        ]
+
+        classifications = await temp_memory.process_conversations_bulk(turns)
+        assert len(classifications) == 6
+
+        history = temp_memory.get_conversation_history(
+            session_id=desktop,
+            user_id="user1",
+            limit=10
+        )
+
+        # History is newest first
+        assert len(history) == 3
+        assert [h.turn_no for h in history] == [3, 2, 1]
+        assert [h.user_input for h in history] == [
+            "Question 4", "Question 2", "Question 0"
+        ]
+
     @pytest.mark.asyncio
     async def test_session_stats(self, temp_memory):
         """Should get accurate session statistics"""
@@ -286,6 +366,53 @@ class TestConversationHistory:
         assert stats["session_id"] == session_id
         assert stats["user_id"] == "user1"
 
+    def test_transaction_rolls_back_on_error(self, temp_memory):
+        """Writes inside a failed transaction should not be kept"""
+        session_id = MemoryManager.generate_session_id("user1", "desktop")
+        store = temp_memory.sql_store
+
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.store_conversation(Conversation(
+                    session_id=session_id,
+                    user_id="user1",
+                    turn_no=1,
+                    user_input="Remember this",
+                    assistant_response="Noted"
+                ))
+                raise RuntimeError("abort")
+
+        assert store.get_session_turn_count(session_id) == 0
+
+    def test_transaction_blocks_other_threads(self, temp_memory):
+        """Writes from another thread wait for the open transaction to end"""
+        session_id = MemoryManager.generate_session_id("user1", "desktop")
+        store = temp_memory.sql_store
+
+        def turn(turn_no, text):
+            return Conversation(
+                session_id=session_id,
+                user_id="user1",
+                turn_no=turn_no,
+                user_input=text,
+                assistant_response="Noted"
+            )
+
+        writer = threading.Thread(target=store.store_conversation, args=(turn(2, "Kept"),))
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.store_conversation(turn(1, "Rolled back"))
+                writer.start()
+                writer.join(timeout=0.2)
+                assert writer.is_alive()
+                raise RuntimeError("abort")
+        writer.join()
+
+        rows = store.conn.execute(
+            "SELECT user_input FROM conversations WHERE session_id = ?", (session_id,)
+        ).fetchall()
+        assert [row["user_input"] for row in rows] == ["Kept"]
+
 
 class TestCleanup:
     """Test old session cleanup"""
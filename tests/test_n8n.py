@@ -11,7 +11,7 @@ import asyncio
 import requests
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from modules.actions.productivity.n8n_webhook import N8nWebhookAction
 from dotenv import load_dotenv
@@ -10,7 +10,7 @@ import os
 import asyncio
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from modules.rag import get_indexer, get_retriever
 
@@ -148,8 +148,10 @@ async def test_retrieval():
                 print(f"      {i}. [{result.relevance_score:.2f}] {result.document_name}")
                 print(f"         {result.content[:100]}...")
             
-            # Check if expected keyword found
-            found = any(expected_keyword.lower() in r.content.lower() for r in results)
+            # Check if expected keyword found (one lowercase pass, one scan;
+            # NUL separators keep phrases from matching across results)
+            haystack = "\0".join(r.content for r in results).lower()
+            found = expected_keyword.lower() in haystack
             if found:
                 print(f"   ✅ Found expected: '{expected_keyword}'")
             else: